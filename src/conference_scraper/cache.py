@@ -0,0 +1,147 @@
+"""On-disk cache of fetched pages, revalidated with conditional requests."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Mapping
+
+logger = logging.getLogger(__name__)
+
+# The only response headers kept: all revalidation needs, and nothing private like cookies ends up in the cache
+VALIDATOR_HEADERS = ("etag", "last-modified")
+
+
+def validators(headers: Mapping[str, str]) -> dict[str, str]:
+    """The VALIDATOR_HEADERS among a response's headers, keyed by lowercased name."""
+    return {name.lower(): value for name, value in headers.items() if name.lower() in VALIDATOR_HEADERS}
+
+
+@dataclass
+class CacheEntry:
+    """A cached response: its validators and the digest of its body."""
+
+    url: str
+    digest: str
+    # The VALIDATOR_HEADERS, with names stored lowercased since servers don't agree on their casing
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.headers.get("last-modified")
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified if the page hasn't changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Content-addressed store of response bodies plus a per-URL index of their headers.
+
+    Bodies live under objects/ named by the SHA-256 of their content (so identical pages are only stored once) and each
+    URL gets a small JSON index entry under index/ with the headers needed to revalidate it. When a page changes its
+    index entry moves on to the new body, leaving the old one for prune() to remove.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.index_dir = root / "index"
+        self.objects_dir = root / "objects"
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _index_path(self, url: str) -> Path:
+        return self.index_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        # Concurrent workers may write the same entry, so write to a temporary file and atomically swap it in
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Return the cached entry for a URL if both its index entry and body are present."""
+        try:
+            with open(self._index_path(url)) as f:
+                entry = CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not self._object_path(entry.digest).exists():
+            return None
+        return entry
+
+    def read(self, entry: CacheEntry) -> bytes:
+        """Read a cached body and count it as a cache hit."""
+        with self._lock:
+            self.hits += 1
+        return self._object_path(entry.digest).read_bytes()
+
+    def store(self, url: str, content: bytes, headers: Mapping[str, str]) -> None:
+        """Cache a response body with its validators. Responses without any can't be revalidated so are skipped."""
+        with self._lock:
+            self.misses += 1
+        entry = CacheEntry(url=url, digest=hashlib.sha256(content).hexdigest(), headers=validators(headers))
+        if not entry.conditional_headers():
+            logger.debug(f"Not caching {url}: response has no ETag or Last-Modified header")
+            return
+
+        object_path = self._object_path(entry.digest)
+        if not object_path.exists():
+            self._write_atomic(object_path, content)
+        self._write_atomic(self._index_path(url), json.dumps(asdict(entry)).encode())
+
+    def prune(self) -> int:
+        """Delete the bodies no index entry refers to anymore (and temporary files left by interrupted writes).
+
+        Index entries written when every response header was cached are cut down to their validators on the way.
+
+        Must not run while pages are being fetched into the cache.
+
+        Returns:
+            The number of files deleted
+        """
+        referenced = set()
+        for index_path in self.index_dir.glob("*.json"):
+            try:
+                with open(index_path) as f:
+                    entry = CacheEntry(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                continue
+            referenced.add(entry.digest)
+            if entry.headers.keys() - VALIDATOR_HEADERS:
+                entry.headers = validators(entry.headers)
+                self._write_atomic(index_path, json.dumps(asdict(entry)).encode())
+
+        deleted = 0
+        # Object directories hold both bodies and .tmp- files
+        for path in [*self.objects_dir.glob("*/*"), *self.index_dir.glob(".tmp-*")]:
+            if path.name not in referenced:
+                path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
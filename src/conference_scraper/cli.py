@@ -3,121 +3,345 @@
 import json
 import logging
 import os
-import re
-import shutil
 import sqlite3
 import time
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
-import pandas as pd
 import typer
-from groq import Groq
-from tqdm import tqdm
 
-from .config import setup_logging
-from .database import insert_data_with_topics, setup_sql
-from .scraper import scrape_conference_pages, scrape_talk_data_parallel, scrape_talk_urls
+from .compression import ensure_zstd_available
+from .config import (
+    DEFAULT_MAX_RATE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_TOPIC_ATTEMPTS,
+    DEFAULT_TOPIC_REQUESTS_PER_MINUTE,
+    DEFAULT_TOPIC_TOKENS_PER_MINUTE,
+    DEFAULT_TOPIC_WORKERS,
+    DEFAULT_WORKERS,
+    Engine,
+    Parser,
+    ensure_parser_available,
+    setup_logging,
+)
+from .database import (
+    ScraperConnection,
+    build_no_text_db,
+    bulk_build,
+    claim_topic_jobs,
+    complete_topic_job,
+    compress_talk_texts,
+    count_topic_jobs,
+    enqueue_topic_jobs,
+    fail_topic_job,
+    get_conference_fingerprints,
+    get_talk_urls,
+    insert_talks,
+    refresh_talk_details,
+    register_text_functions,
+    release_topic_jobs,
+    reset_topic_jobs,
+    search_talks,
+    set_conference_fingerprints,
+    setup_sql,
+    topic_job_clock,
+)
+from .export import JsonBackend, JsonWriter, ensure_json_backend_available, write_json, write_ndjson
+from .models import Talk
 
 app = typer.Typer()
 
+# Topic jobs claimed and committed at a time, so an interrupted run leaves at most this many to be retried
+TOPIC_JOB_BATCH_SIZE = 32
 
-def main_scrape_process(outputs_dir: Path, extract_topics: bool = False, groq_api_key: str | None = None) -> None:
+
+def extract_queued_topics(
+    con: sqlite3.Connection,
+    groq_api_key: str | None = None,
+    workers: int = DEFAULT_TOPIC_WORKERS,
+    requests_per_minute: float = DEFAULT_TOPIC_REQUESTS_PER_MINUTE,
+    tokens_per_minute: float = DEFAULT_TOPIC_TOKENS_PER_MINUTE,
+    max_attempts: int = DEFAULT_TOPIC_ATTEMPTS,
+    retry_failed: bool = False,
+) -> dict[str, int]:
+    """Queue topic extraction for the talks that don't have topics yet and work through the queue.
+
+    Jobs are claimed in batches which are committed before their requests are sent, and their results are committed as
+    soon as the batch is done, so a run can be interrupted at any point and the next one picks up where it stopped. A
+    job that fails is left for the next run rather than retried straight away.
+
+    Args:
+        con: Connection to a database with the topic tables (see setup_sql)
+        groq_api_key: Groq API key (if None, uses GROQ_API_KEY env var)
+        workers: Number of concurrent topic extraction requests
+        requests_per_minute: Requests per minute allowed by the Groq account
+        tokens_per_minute: Tokens per minute allowed by the Groq account
+        max_attempts: Attempts per talk before its job is marked failed
+        retry_failed: Give the talks whose jobs failed in earlier runs fresh attempts
+
+    Returns:
+        dict: The number of jobs in each status once the queue is drained
+
+    Raises:
+        groq.AuthenticationError, groq.PermissionDeniedError: If the API rejects the key. No job loses an attempt to it
+    """
+    import groq
+
+    from .topic_extractor import TopicExtractor
+
+    logger = logging.getLogger(__name__)
+    cur = con.cursor()
+
+    requeued = reset_topic_jobs(cur, retry_failed)
+    if requeued:
+        logger.info(f"Requeued {requeued} topic extraction jobs left over from earlier runs")
+    queued = enqueue_topic_jobs(cur)
+    con.commit()
+    logger.info(f"Queued topic extraction for {queued} new talks")
+    run_started = topic_job_clock(cur)
+
+    # Retries are left to the extractor so every worker backs off together when the API throttles
+    client = groq.Groq(api_key=groq_api_key, max_retries=0)
+    with TopicExtractor(client, workers, requests_per_minute, tokens_per_minute) as extractor:
+        while jobs := claim_topic_jobs(cur, TOPIC_JOB_BATCH_SIZE, attempted_before=run_started):
+            # Committing the claim first means a crash leaves these jobs running, which the next run requeues
+            con.commit()
+            results = extractor.extract_many([text or "" for _, text in jobs])
+            # Every request fails the same way until the key is fixed, so stop instead of using up all the attempts
+            rejected = [
+                (talk_id, result)
+                for (talk_id, _), result in zip(jobs, results)
+                if isinstance(result, (groq.AuthenticationError, groq.PermissionDeniedError))
+            ]
+            if rejected:
+                release_topic_jobs(cur, [talk_id for talk_id, _ in rejected])
+                con.commit()
+                error = rejected[0][1]
+                logger.error(f"Stopping topic extraction, the Groq API rejected the API key: {error}")
+                raise error
+            for (talk_id, _), result in zip(jobs, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to extract topics for talk {talk_id}: {result}")
+                    fail_topic_job(cur, talk_id, str(result) or type(result).__name__, max_attempts)
+                else:
+                    complete_topic_job(cur, talk_id, result)
+            con.commit()
+
+    counts = count_topic_jobs(cur)
+    logger.info(
+        f"Topic extraction: {counts.get('done', 0)} talks done, {counts.get('pending', 0)} pending, "
+        f"{counts.get('failed', 0)} failed"
+    )
+    return counts
+
+
+def main_scrape_process(
+    outputs_dir: Path,
+    extract_topics: bool = False,
+    groq_api_key: str | None = None,
+    workers: int = DEFAULT_WORKERS,
+    engine: Engine = Engine.threads,
+    parse_workers: int | None = None,
+    parser: Parser = Parser.html5lib,
+    http_cache: bool = True,
+    incremental: bool = False,
+    max_rate: float = DEFAULT_MAX_RATE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    materialize_talk_details: bool = False,
+    compress_texts: bool = False,
+    json_backend: JsonBackend = JsonBackend.json,
+    ndjson: bool = False,
+    topic_workers: int = DEFAULT_TOPIC_WORKERS,
+    topic_requests_per_minute: float = DEFAULT_TOPIC_REQUESTS_PER_MINUTE,
+    topic_tokens_per_minute: float = DEFAULT_TOPIC_TOKENS_PER_MINUTE,
+) -> None:
     """Main scraping process orchestration.
 
     Args:
         extract_topics: Whether to extract topics from talk texts
         groq_api_key: Groq API key for topic extraction (if None, uses GROQ_API_KEY env var)
+        workers: Number of concurrent page fetches
+        engine: Whether to scrape talks with a thread pool or the fetch/parse pipeline
+        parse_workers: Number of processes parsing talk pages in the pipeline engine (defaults to the CPU count)
+        parser: HTML parser backend used for conference indexes and talk pages
+        http_cache: Whether to cache fetched pages under outputs_dir and revalidate them with conditional requests
+        incremental: Only scrape talks whose URLs aren't in the database yet (skipping conferences whose index is
+            unchanged since the last run), merging them into the existing JSON
+        max_rate: Highest sustained requests per second per host (automatically lowered when the site answers 429)
+        max_retries: How many times to retry a page after connection errors, timeouts, 429s and 5xx responses
+        materialize_talk_details: Create the talk_details_materialized table (a database that already has it keeps it
+            up to date either way)
+        compress_texts: Store talk texts as zstd BLOBs compressed with a dictionary trained on the talks (a database
+            that is already compressed stays compressed either way)
+        json_backend: Serializer used to write the JSON exports
+        ndjson: Also export the talks as newline-delimited JSON (conference_talks.ndjson)
+        topic_workers: Number of concurrent topic extraction requests
+        topic_requests_per_minute: Requests per minute allowed by the Groq account
+        topic_tokens_per_minute: Tokens per minute allowed by the Groq account
     """
+    # The scraping stack (requests, BeautifulSoup, the parsers) is only imported once a scrape actually starts, so
+    # `--help` and the search command don't pay for it
+    from .cache import ResponseCache
+    from .fetch import configure_client
+    from .scraper import (
+        ScrapeExecutor,
+        fingerprint_talk_urls,
+        remove_known_talks,
+        scrape_conference_pages,
+        stream_talk_data,
+    )
+
     logger = logging.getLogger(__name__)
 
+    # Keep one pooled keep-alive connection per worker so no request has to wait on a fresh TCP+TLS handshake
+    cache = ResponseCache(outputs_dir / "http_cache") if http_cache else None
+    configure_client(pool_size=workers, cache=cache, max_rate=max_rate, max_retries=max_retries)
+
     # Doing this first to make the feedback loop for SQL schema changes faster
     con, cur, db_file = setup_sql(outputs_dir, extract_topics)
+    # A compressed database compresses the new texts of every run, so fail before scraping if that isn't possible
+    if compress_texts or con.text_codec.dictionaries:
+        ensure_zstd_available()
 
-    main_url = "https://www.churchofjesuschrist.org/study/general-conference?lang=eng"
-    conference_urls = scrape_conference_pages(main_url)
-
-    total_sessions = 0
-    total_talks = 0
-    all_talk_urls: dict[str, dict[str, list[str]]] = {}
-    for conference_url in tqdm(conference_urls, desc="Scraping conferences", unit="conferences"):
-        match = re.search(r"/study/general-conference/(?P<year>\d{4})/(?P<season>(04|10)).+", conference_url)
-        if not match:
-            raise ValueError("What kind of garbage links are you getting??")
-        year = match.group("year")
-        season = match.group("season")
-        key = f"{year}-{season}"
-        urls = scrape_talk_urls(conference_url)
-        total_sessions += len(urls)
-        total_talks += sum(len(talks) for talks in urls.values())
-        all_talk_urls[key] = urls
-
-    logger.info(f"Found {total_talks} total talks across {total_sessions} sessions of General Conference")
-
-    # Scrape talks in parallel
-    conference_talks = scrape_talk_data_parallel(all_talk_urls, total_talks)
-
-    # Create DataFrame from the scraped data
-    conference_df = pd.DataFrame(conference_talks)
-
-    # Normalize Unicode and clean data
-    for col in conference_df.columns:
-        conference_df[col] = conference_df[col].apply(
-            lambda x: unicodedata.normalize("NFD", x).replace("\t", "    ").replace("\xa0", " ")
-            if isinstance(x, str)
-            else x
-        )
-    conference_df.sort_values(
-        ["year", "season", "url", "speaker", "title"],
-        ascending=[True, True, True, True, True],
-        inplace=True,
+    json_file = outputs_dir / "conference_talks.json"
+    ndjson_file = json_file.with_suffix(".ndjson")
+    # A full run exports the talks as their conferences arrive, which is already the export order, so the corpus is
+    # never held in memory. An incremental run only scrapes the new talks and merges them into the previous export once
+    # they are all in.
+    exports = ExitStack()
+    writers: list[JsonWriter] = []
+    if not incremental:
+        writers.append(exports.enter_context(JsonWriter(json_file, json_backend)))
+        if ndjson:
+            writers.append(exports.enter_context(JsonWriter(ndjson_file, json_backend, ndjson=True)))
+
+    # One executor discovers the conferences and scrapes their talks, so both share its workers
+    with exports, ScrapeExecutor(engine, workers, parser, parse_workers) as executor:
+        main_url = "https://www.churchofjesuschrist.org/study/general-conference?lang=eng"
+        conference_urls = scrape_conference_pages(main_url, executor)
+        # An unreadable main page must fail the run rather than replace the previous exports with empty ones
+        if not conference_urls:
+            raise RuntimeError(f"Found no conferences at {main_url}, aborting without exporting anything")
+
+        previous_fingerprints = get_conference_fingerprints(cur) if incremental else {}
+        known_urls = get_talk_urls(cur) if incremental else set()
+        unchanged_conferences = 0
+        total_sessions = 0
+        total_talks = 0
+
+        def select_talks(conference_url: str, sessions: dict[str, list[str]]) -> dict[str, list[str]]:
+            nonlocal unchanged_conferences, total_sessions, total_talks
+            if sessions and previous_fingerprints.get(conference_url) == fingerprint_talk_urls(sessions):
+                unchanged_conferences += 1
+                return {}
+            if incremental:
+                sessions = remove_known_talks({conference_url: sessions}, known_urls).get(conference_url, {})
+            total_sessions += len(sessions)
+            total_talks += sum(len(talks) for talks in sessions.values())
+            return sessions
+
+        # Talks are scraped as soon as their conference is discovered and are bulk loaded into the database conference
+        # by conference (in chronological order, one transaction each) as soon as they are scraped
+        total_new_talks = 0
+        scraped_talks = 0
+        new_talks_to_merge: list[Talk] = []
+        with bulk_build(con):
+            for conference_url, sessions, talks, failed_urls in stream_talk_data(
+                conference_urls, executor, select_talks
+            ):
+                scraped_talks += len(talks)
+                for writer in writers:
+                    writer.write_all(talk.to_dict() for talk in talks)
+                if incremental:
+                    new_talks_to_merge.extend(talks)
+                new_talks, failed_inserts = insert_talks(cur, talks)
+                total_new_talks += new_talks
+                failed_urls += failed_inserts
+
+                # Remember the conference's talk listing so later incremental runs can skip it, unless some of its
+                # talks failed to scrape or save and still need to be retried
+                if sessions and not failed_urls:
+                    set_conference_fingerprints(cur, {conference_url: fingerprint_talk_urls(sessions)})
+                con.commit()
+
+        # Same for a full run where every talk failed, before the writers replace the previous JSON
+        if not incremental and not scraped_talks:
+            raise RuntimeError("No talks could be scraped, aborting without exporting anything")
+
+    # Pages that aren't talks (sustainings, reports, ...) and pages that failed to scrape don't count as scraped
+    logger.info(
+        f"Scraped {scraped_talks} talks from {total_talks} talk pages across {total_sessions} sessions of General "
+        "Conference"
     )
+    if unchanged_conferences:
+        logger.info(f"Skipped {unchanged_conferences} conferences whose talk listings are unchanged")
+    if incremental:
+        logger.info("Incremental mode: only talks that were not in the database yet were scraped")
+    logger.info(f"Loaded {total_new_talks} new talks into the database")
     logger.info("Scraping complete")
+    if cache:
+        logger.info(f"HTTP cache: {cache.hits} pages unchanged, {cache.misses} downloaded")
+        pruned = cache.prune()
+        if pruned:
+            logger.info(f"HTTP cache: removed {pruned} superseded pages")
+    logger.info(f"Dimension ID cache: {con.dimensions.hits} hits, {con.dimensions.misses} misses")
 
-    # Save to JSON
-    json_file = outputs_dir / "conference_talks.json"
-    conference_json = conference_df.to_dict(orient="records")
-    with open(json_file, "w") as f:
-        json.dump(conference_json, f, indent=2, sort_keys=True)
-    logger.info(f"JSON data saved to '{json_file}'.")
-
-    # Set up topic extraction client if needed
-    topic_client = None
+    # Topics are extracted once the talks are safely stored, so a slow or failing request never holds up loading them
     if extract_topics:
-        topic_client = Groq(api_key=groq_api_key)
-        logger.info("Topic extraction enabled - processing talks sequentially")
-
-    # Process talks one by one, extracting topics immediately for new talks
-    total_new_talks = 0
-    for idx, row in tqdm(conference_df.iterrows(), desc="Processing talks", unit="talk", total=len(conference_df)):
-        try:
-            # Insert talk data and get whether it's new
-            is_new = insert_data_with_topics(cur, row, topic_client)
-            if is_new:
-                total_new_talks += 1
-                con.commit()  # Commit after each new talk to ensure progress is saved
-
-        except Exception as e:
-            logger.exception(f"Failed to process talk '{row.title}' ({row.year} {row.season}): {e}")
-            continue
+        extract_queued_topics(
+            con,
+            groq_api_key,
+            workers=topic_workers,
+            requests_per_minute=topic_requests_per_minute,
+            tokens_per_minute=topic_tokens_per_minute,
+        )
 
-    if extract_topics:
-        logger.info(f"Processed {total_new_talks} new talks with topic extraction")
-    else:
-        logger.info("Processed all talks (topic extraction disabled)")
+    # Copy the talks loaded in this run into the materialized talk_details table, if the database has one
+    materialized_talks = refresh_talk_details(cur, create=materialize_talk_details)
+    if materialized_talks is not None:
+        con.commit()
+        logger.info(f"Materialized talk_details for {materialized_talks} new talks")
 
-    con.commit()
-    cur.execute("VACUUM")
-    logger.info("SQLite data saved to 'conference_talks.db'.")
+    compressed_texts = compress_talk_texts(cur, enable=compress_texts)
+    if compressed_texts is not None:
+        con.commit()
+        logger.info(f"Compressed {compressed_texts} talk texts")
 
-    # Duplicate db without the talk text to save space
+    # The no-text copy only reads the committed database, so build it while the JSON is merged
+    con.commit()
     no_text_db = db_file.parent / "conference_talks_no_text.db"
-    shutil.copy2(str(db_file), str(no_text_db))
-    con = sqlite3.connect(no_text_db)
-    cur = con.cursor()
-    cur.execute("DROP TABLE talk_texts")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        no_text_build = pool.submit(build_no_text_db, db_file, no_text_db)
+
+        if incremental:
+            talks = new_talks_to_merge
+            # Only new talks were scraped, so fold them into the previous export to keep the JSON complete
+            if json_file.exists():
+                with open(json_file) as f:
+                    previous_talks = [Talk.from_dict(record) for record in json.load(f)]
+                # A newly scraped talk replaces a previously exported one with the same URL
+                talks = list({talk.url: talk for talk in [*previous_talks, *new_talks_to_merge]}.values())
+            talks.sort(key=Talk.sort_key)
+
+            # Stream the records to JSON one at a time instead of building another copy of the whole corpus
+            def records():
+                return (talk.to_dict() for talk in talks)
+
+            write_json(records(), json_file, json_backend)
+            if ndjson:
+                write_ndjson(records(), ndjson_file, json_backend)
+
+        logger.info(f"JSON data saved to '{json_file}'.")
+        if ndjson:
+            logger.info(f"NDJSON data saved to '{ndjson_file}'.")
+
+        no_text_build.result()
+    logger.info(f"SQLite data without talk texts saved to '{no_text_db.name}'.")
+
     cur.execute("VACUUM")
-    con.commit()
+    logger.info("SQLite data saved to 'conference_talks.db'.")
 
 
 @app.command()
@@ -129,6 +353,54 @@ def scrape(
         False, "--extract-topics", help="Extract 3-10 topics from talk texts using Groq API"
     ),
     groq_api_key: str | None = typer.Option(None, "--groq-api-key", help="Groq API key (or set GROQ_API_KEY env var)"),
+    workers: int = typer.Option(
+        DEFAULT_WORKERS, "--workers", min=1, help="Number of concurrent page fetches and pooled connections"
+    ),
+    engine: Engine = typer.Option(Engine.threads, "--engine", help="Concurrency engine used to scrape talk pages"),
+    parse_workers: int | None = typer.Option(
+        None, "--parse-workers", min=1, help="Processes parsing talk pages with --engine pipeline (default: CPU count)"
+    ),
+    parser: Parser = typer.Option(
+        Parser.html5lib, "--parser", help="HTML parser backend (lxml and selectolax need the fast-parsers extra)"
+    ),
+    http_cache: bool = typer.Option(
+        True, "--http-cache/--no-http-cache", help="Cache pages on disk and only re-download them when they change"
+    ),
+    incremental: bool = typer.Option(
+        False, "--incremental", help="Only scrape talks that aren't already in the existing database"
+    ),
+    max_rate: float = typer.Option(
+        DEFAULT_MAX_RATE,
+        "--max-rate",
+        min=0.1,
+        help="Highest sustained requests per second per host (lowered automatically when throttled)",
+    ),
+    max_retries: int = typer.Option(
+        DEFAULT_MAX_RETRIES, "--max-retries", min=0, help="Retries per page for connection errors, 429s and 5xx"
+    ),
+    materialize_talk_details: bool = typer.Option(
+        False,
+        "--materialize-talk-details",
+        help="Store the talk_details view as an indexed table (kept up to date in later runs)",
+    ),
+    compress_texts: bool = typer.Option(
+        False,
+        "--compress-texts",
+        help="Store talk texts zstd-compressed with a trained dictionary (needs the compression extra)",
+    ),
+    json_backend: JsonBackend = typer.Option(
+        JsonBackend.json, "--json-backend", help="JSON serializer (orjson needs the fast-json extra)"
+    ),
+    ndjson: bool = typer.Option(False, "--ndjson", help="Also write the talks to conference_talks.ndjson"),
+    topic_workers: int = typer.Option(
+        DEFAULT_TOPIC_WORKERS, "--topic-workers", min=1, help="Concurrent topic extraction requests"
+    ),
+    topic_rpm: float = typer.Option(
+        DEFAULT_TOPIC_REQUESTS_PER_MINUTE, "--topic-rpm", min=1, help="Requests per minute allowed by the Groq account"
+    ),
+    topic_tpm: float = typer.Option(
+        DEFAULT_TOPIC_TOKENS_PER_MINUTE, "--topic-tpm", min=100, help="Tokens per minute allowed by the Groq account"
+    ),
 ):
     """Run the conference scraper."""
     api_key = groq_api_key or os.getenv("GROQ_API_KEY")
@@ -137,6 +409,10 @@ def scrape(
             raise AttributeError(
                 "Topic extraction requested but no API key provided. Set GROQ_API_KEY or use --groq-api-key"
             )
+    ensure_parser_available(parser)
+    if compress_texts:
+        ensure_zstd_available()
+    ensure_json_backend_available(json_backend)
 
     outputs_dir = Path(outputs_dir)
     if not outputs_dir.exists():
@@ -148,11 +424,121 @@ def scrape(
 
     # Run the scraper
     start = time.time()
-    main_scrape_process(outputs_dir=outputs_dir, extract_topics=extract_topics, groq_api_key=api_key)
+    main_scrape_process(
+        outputs_dir=outputs_dir,
+        extract_topics=extract_topics,
+        groq_api_key=api_key,
+        workers=workers,
+        engine=engine,
+        parse_workers=parse_workers,
+        parser=parser,
+        http_cache=http_cache,
+        incremental=incremental,
+        max_rate=max_rate,
+        max_retries=max_retries,
+        materialize_talk_details=materialize_talk_details,
+        compress_texts=compress_texts,
+        json_backend=json_backend,
+        ndjson=ndjson,
+        topic_workers=topic_workers,
+        topic_requests_per_minute=topic_rpm,
+        topic_tokens_per_minute=topic_tpm,
+    )
     end = time.time()
 
     logger.info(f"Total time taken: {end - start:.2f} seconds")
 
 
+@app.command("extract-topics")
+def extract_topics_command(
+    outputs_dir: str = "data",
+    verbose: bool = False,
+    log_file: str | None = None,
+    groq_api_key: str | None = typer.Option(None, "--groq-api-key", help="Groq API key (or set GROQ_API_KEY env var)"),
+    topic_workers: int = typer.Option(
+        DEFAULT_TOPIC_WORKERS, "--topic-workers", min=1, help="Concurrent topic extraction requests"
+    ),
+    topic_rpm: float = typer.Option(
+        DEFAULT_TOPIC_REQUESTS_PER_MINUTE, "--topic-rpm", min=1, help="Requests per minute allowed by the Groq account"
+    ),
+    topic_tpm: float = typer.Option(
+        DEFAULT_TOPIC_TOKENS_PER_MINUTE, "--topic-tpm", min=100, help="Tokens per minute allowed by the Groq account"
+    ),
+    max_attempts: int = typer.Option(
+        DEFAULT_TOPIC_ATTEMPTS, "--max-attempts", min=1, help="Attempts per talk before its job is marked failed"
+    ),
+    retry_failed: bool = typer.Option(
+        False, "--retry-failed", help="Give talks whose topic extraction failed in earlier runs another try"
+    ),
+):
+    """Extract topics for the talks in a scraped database that don't have any yet, resuming any interrupted run."""
+    api_key = groq_api_key or os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise AttributeError(
+            "Topic extraction requested but no API key provided. Set GROQ_API_KEY or use --groq-api-key"
+        )
+
+    outputs_dir = Path(outputs_dir)
+    if not (outputs_dir / "conference_talks.db").exists():
+        typer.echo(f"No database in '{outputs_dir}', run the scrape command first", err=True)
+        raise typer.Exit(1)
+    setup_logging(verbose, log_file)
+
+    logger = logging.getLogger(__name__)
+    start = time.time()
+    con, _, _ = setup_sql(outputs_dir, extract_topics=True)
+    try:
+        # The texts sent to the API are decompressed on the way out of a compressed database
+        if con.text_codec.dictionaries:
+            ensure_zstd_available()
+        counts = extract_queued_topics(
+            con,
+            api_key,
+            workers=topic_workers,
+            requests_per_minute=topic_rpm,
+            tokens_per_minute=topic_tpm,
+            max_attempts=max_attempts,
+            retry_failed=retry_failed,
+        )
+    finally:
+        con.close()
+    logger.info(f"Total time taken: {time.time() - start:.2f} seconds")
+    if counts.get("failed"):
+        raise typer.Exit(1)
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(
+        ..., help="Full-text query, e.g. 'faith AND hope', '\"plan of salvation\"' or 'atone*'"
+    ),
+    outputs_dir: str = "data",
+    limit: int = typer.Option(10, "--limit", min=1, help="Most talks to show"),
+):
+    """Search the text of the talks in a scraped database, best matches first."""
+    db_file = Path(outputs_dir) / "conference_talks.db"
+    if not db_file.exists():
+        typer.echo(f"No database at '{db_file}', run the scrape command first", err=True)
+        raise typer.Exit(1)
+
+    con = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True, factory=ScraperConnection)
+    try:
+        # Snippets are read through talk_texts_plain, which needs talk_text() if the texts are compressed
+        register_text_functions(con)
+        # Talk texts are stored NFD-normalized, so match the query the same way
+        results = search_talks(con.cursor(), unicodedata.normalize("NFD", query), limit)
+    except sqlite3.OperationalError as e:
+        typer.echo(f"Search failed: {e}", err=True)
+        raise typer.Exit(1)
+    finally:
+        con.close()
+
+    if not results:
+        typer.echo("No talks found")
+    for number, talk in enumerate(results, start=1):
+        typer.echo(f"{number}. {talk['title']} - {talk['speaker']} ({talk['season']} {talk['year']})")
+        typer.echo(f"   {' '.join(talk['snippet'].split())}")
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,76 @@
+"""Optional zstd compression of talk texts using a dictionary trained on the corpus."""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Talks are compressed one at a time, which on its own leaves zstd very little to learn from. A dictionary trained on
+# the whole corpus gives every talk the shared vocabulary and phrasing up front.
+DICTIONARY_SIZE = 112 * 1024
+COMPRESSION_LEVEL = 19
+# Too few samples can't train a useful dictionary (zstd refuses outright when there are very few)
+MIN_TRAINING_SAMPLES = 64
+
+
+def ensure_zstd_available() -> None:
+    """Raise an ImportError up front if the optional zstandard dependency isn't installed."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Compressed talk texts require optional dependencies. Install them with: uv sync --extra compression"
+        ) from e
+
+
+def train_dictionary(texts: list[str], size: int = DICTIONARY_SIZE) -> tuple[int, bytes]:
+    """Train a zstd dictionary on sample texts and return its ID and raw bytes."""
+    import zstandard
+
+    dictionary = zstandard.train_dictionary(size, [text.encode() for text in texts])
+    return dictionary.dict_id(), dictionary.as_bytes()
+
+
+class TextCodec:
+    """Compresses texts into zstd frames and decompresses them with whichever dictionary they were compressed with.
+
+    Frames record the ID of their dictionary, so texts compressed with an older dictionary stay readable after a new
+    one is trained. New texts are always compressed with the most recently added dictionary.
+    """
+
+    def __init__(self, dictionaries: dict[int, bytes] | None = None):
+        # Dictionary ID -> raw dictionary, oldest first
+        self.dictionaries: dict[int, bytes] = dict(dictionaries or {})
+        self._compressors = {}
+        self._decompressors = {}
+
+    def add_dictionary(self, dict_id: int, data: bytes) -> None:
+        self.dictionaries[dict_id] = data
+
+    def compress(self, text: str) -> bytes:
+        """Compress a text with the newest dictionary."""
+        import zstandard
+
+        dict_id = next(reversed(self.dictionaries))
+        compressor = self._compressors.get(dict_id)
+        if compressor is None:
+            dictionary = zstandard.ZstdCompressionDict(self.dictionaries[dict_id])
+            compressor = self._compressors[dict_id] = zstandard.ZstdCompressor(
+                level=COMPRESSION_LEVEL, dict_data=dictionary
+            )
+        return compressor.compress(text.encode())
+
+    def decode(self, value: str | bytes | None) -> str | None:
+        """Decompress a compressed text. Anything else (uncompressed text or NULL) is returned as is."""
+        if not isinstance(value, bytes):
+            return value
+
+        import zstandard
+
+        dict_id = zstandard.get_frame_parameters(value).dict_id
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id not in self.dictionaries:
+                raise ValueError(f"Text was compressed with unknown dictionary {dict_id}")
+            dictionary = zstandard.ZstdCompressionDict(self.dictionaries[dict_id])
+            decompressor = self._decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return decompressor.decompress(value).decode()
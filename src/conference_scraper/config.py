@@ -1,7 +1,64 @@
-"""Configuration and logging setup."""
+"""Configuration, command-line choices and logging setup.
+
+Kept free of heavy dependencies so the CLI can define its options without importing the scraping stack.
+"""
 
 import logging
 import sys
+from enum import Enum
+
+# Highest sustained request rate per host; the limiter backs off from here whenever the site answers 429
+DEFAULT_MAX_RATE = 20.0
+DEFAULT_MAX_RETRIES = 5
+# Pages fetched at once. Scraping waits on the network, not the CPU, so this isn't tied to the CPU count: sustaining
+# DEFAULT_MAX_RATE with around half a second per page takes about ten requests in flight. The per-host limiter, not
+# the number of workers, sets the pace.
+DEFAULT_WORKERS = 16
+
+# Topic extraction limits, matching the Groq free tier for the model used
+DEFAULT_TOPIC_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOPIC_TOKENS_PER_MINUTE = 6000
+DEFAULT_TOPIC_WORKERS = 4
+# Times a talk's topic extraction is tried (across runs) before its job is marked failed
+DEFAULT_TOPIC_ATTEMPTS = 3
+
+
+class Engine(str, Enum):
+    """Concurrency engine used to scrape talk pages."""
+
+    threads = "threads"
+    pipeline = "pipeline"
+
+
+class Parser(str, Enum):
+    """HTML parser backend used to build page trees.
+
+    html5lib is the slowest but most lenient. lxml is a much faster C tree builder for BeautifulSoup. selectolax
+    parses talk pages with the lexbor engine directly (skipping BeautifulSoup entirely) and falls back to lxml for the
+    conference index pages, which rely on BeautifulSoup's CSS selector support.
+    """
+
+    html5lib = "html5lib"
+    lxml = "lxml"
+    selectolax = "selectolax"
+
+    @property
+    def tree_builder(self) -> str:
+        """The BeautifulSoup tree builder used for this backend."""
+        return "html5lib" if self == Parser.html5lib else "lxml"
+
+
+def ensure_parser_available(parser: Parser) -> None:
+    """Raise an ImportError up front if the optional dependencies for a parser backend aren't installed."""
+    try:
+        if parser != Parser.html5lib:
+            import lxml  # noqa: F401
+        if parser == Parser.selectolax:
+            import selectolax  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            f"The {parser.value} parser requires optional dependencies. Install them with: uv sync --extra fast-parsers"
+        ) from e
 
 
 def setup_logging(verbose: bool = False, log_file: str | None = None) -> None:
@@ -27,3 +84,10 @@ def setup_logging(verbose: bool = False, log_file: str | None = None) -> None:
 
     handler.setFormatter(formatter)
     logger.addHandler(handler)
+
+
+def current_logging_setup() -> tuple[bool, str | None]:
+    """The (verbose, log_file) arguments that make setup_logging reproduce the current logging, e.g. in subprocesses."""
+    logger = logging.getLogger()
+    log_file = next((h.baseFilename for h in logger.handlers if isinstance(h, logging.FileHandler)), None)
+    return logger.isEnabledFor(logging.DEBUG), log_file
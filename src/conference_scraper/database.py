@@ -1,20 +1,20 @@
 """Database operations for storing conference data."""
 
-import functools
 import logging
+import os
 import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
-import pandas as pd
-from groq import Groq
-
-from . import topic_extractor
-from .models import Calling, get_speaker
+from .compression import MIN_TRAINING_SAMPLES, TextCodec, ensure_zstd_available, train_dictionary
+from .models import Calling, Talk, get_speaker
 
 logger = logging.getLogger(__name__)
 
 # Current schema version - increment this when making schema changes
-CURRENT_SCHEMA_VERSION = 1
+CURRENT_SCHEMA_VERSION = 5
 
 
 def get_schema_version(cur: sqlite3.Cursor) -> int:
@@ -136,15 +136,7 @@ def migrate_to_v1(cur: sqlite3.Cursor, extract_topics: bool = False) -> None:
         )
     """)
     if extract_topics:
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS talk_topics(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                talk INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                UNIQUE(talk, name) ON CONFLICT IGNORE
-                FOREIGN KEY(talk) REFERENCES talks
-            )
-        """)
+        create_topic_tables(cur)
 
     cur.execute("""
         CREATE VIEW talk_details AS
@@ -192,6 +184,184 @@ def migrate_to_v1(cur: sqlite3.Cursor, extract_topics: bool = False) -> None:
     """)
 
 
+def migrate_to_v2(cur: sqlite3.Cursor) -> None:
+    """Apply migration to version 2: Conference index fingerprints for change detection."""
+    logger.info("Applying migration to version 2 (conference fingerprints)")
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS conference_fingerprints(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT UNIQUE NOT NULL,
+            fingerprint TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+# Created by migration 3. bulk_build defers them while loading an empty database, so setup_sql re-applies them on every
+# open in case a build was killed before it got to recreate them.
+VIEW_INDEXES = {
+    "idx_talks_conference": "talks(conference, id)",
+    "idx_talk_speakers_speaker": "talk_speakers(speaker, talk)",
+    "idx_talk_callings_calling": "talk_callings(calling, talk)",
+    "idx_talk_sessions_session": "talk_sessions(session, talk)",
+    "idx_talk_urls_url": "talk_urls(url, talk)",
+    "idx_callings_organization": "callings(organization, id)",
+}
+
+
+def create_view_indexes(cur: sqlite3.Cursor) -> None:
+    for name, columns in VIEW_INDEXES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+
+def migrate_to_v3(cur: sqlite3.Cursor) -> None:
+    """Apply migration to version 3: Indexes for the join paths of the talk_details and speaker_highest_calling views.
+
+    The UNIQUE constraints already give every junction table an index leading with its talk column, so these cover the
+    lookups going the other way (and the talks of a conference) without touching the table rows.
+
+    talk_details groups by talk, so SQLite only pushes a filter on its id column down into the joins. Filtering it by
+    year, speaker or any other column still scans every talk and builds its group before discarding it. Queries like
+    those should start from the base tables, or use talk_details_materialized and its year and speaker indexes.
+    """
+    logger.info("Applying migration to version 3 (view indexes)")
+
+    create_view_indexes(cur)
+
+
+def migrate_to_v4(cur: sqlite3.Cursor) -> None:
+    """Apply migration to version 4: Full-text search index over the talk texts.
+
+    talk_texts_fts is an external-content FTS5 table, so it only stores the index and reads the texts themselves from
+    talk_texts. Triggers keep the index in sync with every insert, update and delete on talk_texts.
+    """
+    logger.info("Applying migration to version 4 (full-text search)")
+
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS talk_texts_fts USING fts5(
+            text,
+            content='talk_texts',
+            content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS talk_texts_fts_insert AFTER INSERT ON talk_texts BEGIN
+            INSERT INTO talk_texts_fts(rowid, text) VALUES (new.id, new.text);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS talk_texts_fts_delete AFTER DELETE ON talk_texts BEGIN
+            INSERT INTO talk_texts_fts(talk_texts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS talk_texts_fts_update AFTER UPDATE ON talk_texts BEGIN
+            INSERT INTO talk_texts_fts(talk_texts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            INSERT INTO talk_texts_fts(rowid, text) VALUES (new.id, new.text);
+        END
+    """)
+    # Index the texts already in the database
+    cur.execute("INSERT INTO talk_texts_fts(talk_texts_fts) VALUES ('rebuild')")
+
+
+def create_talk_text_readers(cur: sqlite3.Cursor, compressed: bool = False) -> None:
+    """(Re)create the talk_texts_plain view and the triggers keeping talk_texts_fts in sync with talk_texts.
+
+    Once talk texts are compressed both have to read them through the talk_text() SQL function (see
+    register_text_functions), otherwise they use the column as is so the database works without any custom functions.
+    """
+    text = "talk_text({}.text)" if compressed else "{}.text"
+    old_text, new_text = text.format("old"), text.format("new")
+
+    for trigger in ("talk_texts_fts_insert", "talk_texts_fts_delete", "talk_texts_fts_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("DROP VIEW IF EXISTS talk_texts_plain")
+
+    cur.execute(f"CREATE VIEW talk_texts_plain AS SELECT id, talk, {text.format('talk_texts')} AS text FROM talk_texts")
+    cur.execute(f"""
+        CREATE TRIGGER talk_texts_fts_insert AFTER INSERT ON talk_texts BEGIN
+            INSERT INTO talk_texts_fts(rowid, text) VALUES (new.id, {new_text});
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER talk_texts_fts_delete AFTER DELETE ON talk_texts BEGIN
+            INSERT INTO talk_texts_fts(talk_texts_fts, rowid, text) VALUES ('delete', old.id, {old_text});
+        END
+    """)
+    # Compressing a text in place doesn't change its content, so it doesn't need reindexing
+    cur.execute(f"""
+        CREATE TRIGGER talk_texts_fts_update AFTER UPDATE ON talk_texts WHEN {old_text} IS NOT {new_text} BEGIN
+            INSERT INTO talk_texts_fts(talk_texts_fts, rowid, text) VALUES ('delete', old.id, {old_text});
+            INSERT INTO talk_texts_fts(rowid, text) VALUES (new.id, {new_text});
+        END
+    """)
+
+
+def migrate_to_v5(cur: sqlite3.Cursor) -> None:
+    """Apply migration to version 5: Support for zstd-compressed talk texts.
+
+    Adds the table of trained compression dictionaries and the talk_texts_plain view, which always reads talk texts
+    uncompressed, and points the full-text index at that view so it keeps working once the texts are compressed.
+    """
+    logger.info("Applying migration to version 5 (compressed talk texts)")
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS text_dictionaries(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dict_id INTEGER UNIQUE NOT NULL,
+            dictionary BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("DROP TABLE talk_texts_fts")
+    cur.execute("""
+        CREATE VIRTUAL TABLE talk_texts_fts USING fts5(
+            text,
+            content='talk_texts_plain',
+            content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    """)
+    create_talk_text_readers(cur)
+    cur.execute("INSERT INTO talk_texts_fts(talk_texts_fts) VALUES ('rebuild')")
+
+
+def create_topic_tables(cur: sqlite3.Cursor) -> None:
+    """Create the (optional) extracted talk topics table and the queue of talks waiting for topic extraction.
+
+    Every talk queued in topic_jobs is pending until a run of the extractor claims it, which marks it running and counts
+    the attempt. It ends up done once its topics are stored, or failed once it has run out of attempts. A failed attempt
+    puts the job back to pending for a later run, and jobs still running when a run is interrupted are put back to
+    pending by the next one.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS talk_topics(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            talk INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            UNIQUE(talk, name) ON CONFLICT IGNORE
+            FOREIGN KEY(talk) REFERENCES talks
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS topic_jobs(
+            talk INTEGER PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'running', 'done', 'failed')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            last_attempt_at TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(talk) REFERENCES talks
+        )
+    """)
+    # Queues created before attempts were timestamped
+    if "last_attempt_at" not in {row[1] for row in cur.execute("PRAGMA table_info(topic_jobs)")}:
+        cur.execute("ALTER TABLE topic_jobs ADD COLUMN last_attempt_at TIMESTAMP")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_topic_jobs_status ON topic_jobs(status, talk)")
+
+
 def apply_migrations(
     cur: sqlite3.Cursor, target_version: int = CURRENT_SCHEMA_VERSION, extract_topics: bool = False
 ) -> None:
@@ -208,10 +378,23 @@ def apply_migrations(
                 migrate_to_v1(cur, extract_topics)
                 set_schema_version(cur, version)
                 logger.info(f"Successfully migrated to version {version}")
-            # Add future migrations here as elif blocks:
-            # elif version == 2:
-            #     migrate_to_v2(cur)
-            #     set_schema_version(cur, version)
+            elif version == 2:
+                migrate_to_v2(cur)
+                set_schema_version(cur, version)
+                logger.info(f"Successfully migrated to version {version}")
+            elif version == 3:
+                migrate_to_v3(cur)
+                set_schema_version(cur, version)
+                logger.info(f"Successfully migrated to version {version}")
+            elif version == 4:
+                migrate_to_v4(cur)
+                set_schema_version(cur, version)
+                logger.info(f"Successfully migrated to version {version}")
+            elif version == 5:
+                migrate_to_v5(cur)
+                set_schema_version(cur, version)
+                logger.info(f"Successfully migrated to version {version}")
+            # Add future migrations here as elif blocks
             else:
                 raise ValueError(f"No migration available for version {version}")
     else:
@@ -224,7 +407,7 @@ def setup_sql(outputs_dir: Path, extract_topics: bool = False) -> tuple[sqlite3.
 
     # Create database file if it doesn't exist
     db_exists = db_path.exists()
-    con = sqlite3.connect(db_path)
+    con = sqlite3.connect(db_path, factory=ScraperConnection)
     cur = con.cursor()
 
     # Create schema_versions table first (must be done before migrations)
@@ -238,18 +421,267 @@ def setup_sql(outputs_dir: Path, extract_topics: bool = False) -> tuple[sqlite3.
 
     # Apply any necessary migrations
     apply_migrations(cur, CURRENT_SCHEMA_VERSION, extract_topics)
+    # Heal a bulk build that died before restoring its deferred indexes and the rollback journal
+    create_view_indexes(cur)
+    apply_pragmas(con, SAFE_PRAGMAS)
+    if extract_topics:
+        # The database may have been created without topics
+        create_topic_tables(cur)
+    register_text_functions(con)
 
     if not db_exists:
-        logger.info("Created new database with schema version 1")
+        logger.info(f"Created new database with schema version {CURRENT_SCHEMA_VERSION}")
     else:
         logger.info(f"Database ready (schema version {get_schema_version(cur)})")
 
     return con, cur, db_path
 
 
-@functools.cache
+# Connection profile for loading a lot of data at once. WAL with synchronous=NORMAL only syncs at checkpoints, and a big
+# page cache, in-memory temp storage and memory-mapped I/O keep the load out of the filesystem as much as possible.
+BULK_BUILD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -256 * 1024,  # KiB, i.e. 256 MiB
+    "temp_store": "MEMORY",
+    "mmap_size": 1024 * 1024 * 1024,
+}
+# SQLite's defaults: a single self-contained file with a rollback journal and fully synced commits
+SAFE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -2000,
+    "temp_store": "DEFAULT",
+    "mmap_size": 0,
+}
+
+
+def apply_pragmas(con: sqlite3.Connection, pragmas: dict[str, str | int]) -> None:
+    """Set connection pragmas. journal_mode can't change mid-transaction, so any pending work is committed first."""
+    con.commit()
+    for name, value in pragmas.items():
+        con.execute(f"PRAGMA {name} = {value}")
+
+
+def drop_view_indexes(cur: sqlite3.Cursor) -> list[str]:
+    """Drop the VIEW_INDEXES that exist and return their names.
+
+    Indexes SQLite creates for UNIQUE constraints are kept: the loader relies on them to skip duplicates.
+    """
+    existing = {name for (name,) in cur.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    dropped = [name for name in VIEW_INDEXES if name in existing]
+    for name in dropped:
+        cur.execute(f'DROP INDEX "{name}"')
+    return dropped
+
+
+@contextmanager
+def bulk_build(con: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run a bulk load with the fast BULK_BUILD_PRAGMAS profile.
+
+    When the database has no talks yet, the VIEW_INDEXES are also deferred and built in one pass over the loaded data
+    at the end. Into an existing database the load is small and the indexes stay, so a crash can never lose them, and
+    setup_sql recreates them if a fresh build is killed half way. On exit the connection switches back to
+    SAFE_PRAGMAS, which also checkpoints the WAL back into the main database file.
+
+    If the block raises (or is interrupted), its uncommitted work is rolled back rather than committed, so a talk is
+    never left stored without its text, URL, speakers or session.
+    """
+    cur = con.cursor()
+    deferred_indexes = []
+    if cur.execute("SELECT 1 FROM talks LIMIT 1").fetchone() is None:
+        deferred_indexes = drop_view_indexes(cur)
+    apply_pragmas(con, BULK_BUILD_PRAGMAS)
+    try:
+        yield con
+        con.commit()
+    except BaseException:
+        con.rollback()
+        raise
+    finally:
+        if deferred_indexes:
+            logger.info(f"Creating {len(deferred_indexes)} deferred indexes")
+            create_view_indexes(cur)
+        apply_pragmas(con, SAFE_PRAGMAS)
+
+
+def refresh_talk_details(cur: sqlite3.Cursor, create: bool = False) -> int | None:
+    """Bring the talk_details_materialized table (a copy of the talk_details view) up to date.
+
+    Talks are never changed once they're loaded, so only talks newer than the last materialized one are copied over,
+    each using the view's own aggregation. The table is only maintained once it exists, which `create` takes care of.
+
+    Returns:
+        The number of talks materialized, or None if the table doesn't exist (and wasn't created)
+    """
+    exists = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'talk_details_materialized'"
+    ).fetchone()
+    if not exists:
+        if not create:
+            return None
+        logger.info("Creating materialized talk_details table")
+        cur.execute("""
+            CREATE TABLE talk_details_materialized(
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                emeritus INTEGER NOT NULL,
+                year INTEGER,
+                season TEXT,
+                session TEXT,
+                day INTEGER,
+                speaker TEXT,
+                urls TEXT,
+                calling TEXT,
+                organization TEXT
+            )
+        """)
+        cur.execute("CREATE INDEX idx_talk_details_materialized_year ON talk_details_materialized(year, season)")
+        cur.execute("CREATE INDEX idx_talk_details_materialized_speaker ON talk_details_materialized(speaker)")
+
+    (last_id,) = cur.execute("SELECT COALESCE(MAX(id), 0) FROM talk_details_materialized").fetchone()
+    cur.execute(
+        """
+        INSERT OR REPLACE INTO talk_details_materialized
+        SELECT id, title, emeritus, year, season, session, day, speaker, urls, calling, organization
+        FROM talk_details WHERE id > ?
+        """,
+        (last_id,),
+    )
+    return cur.rowcount
+
+
+def search_talks(cur: sqlite3.Cursor, query: str, limit: int = 10) -> list[dict[str, str | int | float]]:
+    """Full-text search the talk texts, best matches first.
+
+    Args:
+        cur: Database cursor
+        query: FTS5 query, e.g. `faith AND hope`, `"plan of salvation"` or `atone*`
+        limit: Most talks to return
+
+    Returns:
+        list: A dict per matching talk with its details, BM25 rank (lower is better) and a snippet of the text around
+            the match, with the matched terms wrapped in `[` and `]`
+    """
+    # Rank and limit the matches first, then look up just their details in the base tables. Joining the talk_details
+    # view instead would build the whole (grouped, so never flattened) view for every search.
+    rows = cur.execute(
+        """
+        WITH matches AS (
+            SELECT rowid, rank, snippet(talk_texts_fts, 0, '[', ']', '...', 24) as snippet
+            FROM talk_texts_fts
+            WHERE talk_texts_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        )
+        SELECT
+            t.id,
+            t.title,
+            (
+                SELECT GROUP_CONCAT(s.name)
+                FROM talk_speakers ts
+                JOIN speakers s ON s.id = ts.speaker
+                WHERE ts.talk = t.id
+            ) as speaker,
+            c.year,
+            c.season,
+            m.rank,
+            m.snippet
+        FROM matches m
+        JOIN talk_texts tt ON tt.id = m.rowid
+        JOIN talks t ON t.id = tt.talk
+        LEFT JOIN conferences c ON c.id = t.conference
+        ORDER BY m.rank
+        """,
+        (query, limit),
+    )
+    columns = [column[0] for column in rows.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def is_text_object(table_name: str) -> bool:
+    """Whether a schema object belongs to the talk texts (the texts, their views, dictionaries and full-text index)."""
+    return table_name in ("talk_texts", "text_dictionaries") or table_name.startswith("talk_texts_")
+
+
+def build_no_text_db(db_path: Path, no_text_path: Path) -> None:
+    """Build a copy of the database without the talk texts or anything derived from them.
+
+    Instead of copying the whole database and then dropping and vacuuming away the texts, which rewrites the largest
+    file twice, a fresh database is created from the source's schema (minus the text objects) and only the kept tables
+    are copied into it with INSERT ... SELECT. Indexes are created once their tables are filled. The file is built
+    under a temporary name without a journal and moved into place when it's complete.
+    """
+    tmp_path = no_text_path.with_name(f".{no_text_path.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    con = sqlite3.connect(tmp_path)
+    try:
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        con.execute("ATTACH DATABASE ? AS source", (str(db_path),))
+        objects = [
+            (type, name, sql)
+            for type, name, table_name, sql in con.execute(
+                """
+                SELECT type, name, tbl_name, sql FROM source.sqlite_master
+                WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+                ORDER BY rowid
+                """
+            )
+            if not is_text_object(table_name)
+        ]
+        tables = [name for type, name, _ in objects if type == "table"]
+
+        with con:
+            for type, _, sql in objects:
+                if type == "table":
+                    con.execute(sql)
+            for table in tables:
+                con.execute(f'INSERT INTO main."{table}" SELECT * FROM source."{table}"')
+            # Keep the AUTOINCREMENT counters so IDs line up with the full database. The copies above already started
+            # counters of their own, and sqlite_sequence has no unique constraint to stop a second row per table.
+            con.execute("DELETE FROM main.sqlite_sequence")
+            placeholders = ",".join("?" * len(tables))
+            con.execute(
+                f"INSERT INTO main.sqlite_sequence SELECT * FROM source.sqlite_sequence WHERE name IN ({placeholders})",
+                tables,
+            )
+            for type, _, sql in objects:
+                if type != "table":
+                    con.execute(sql)
+        con.execute("DETACH DATABASE source")
+    except BaseException:
+        con.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    con.close()
+    os.replace(tmp_path, no_text_path)
+
+
+def get_talk_urls(cur: sqlite3.Cursor) -> set[str]:
+    """Get the text URLs of every talk already stored in the database."""
+    return {url for (url,) in cur.execute("SELECT url FROM talk_urls WHERE kind = 'text'")}
+
+
+def get_conference_fingerprints(cur: sqlite3.Cursor) -> dict[str, str]:
+    """Get the stored talk-link fingerprint of every conference index page, keyed by URL."""
+    return dict(cur.execute("SELECT url, fingerprint FROM conference_fingerprints"))
+
+
+def set_conference_fingerprints(cur: sqlite3.Cursor, fingerprints: dict[str, str]) -> None:
+    """Store (or update) the talk-link fingerprints of conference index pages."""
+    cur.executemany(
+        """
+        INSERT INTO conference_fingerprints (url, fingerprint) VALUES (?, ?)
+        ON CONFLICT(url) DO UPDATE SET fingerprint = excluded.fingerprint, updated_at = CURRENT_TIMESTAMP
+        """,
+        fingerprints.items(),
+    )
+
+
 def get_or_create_speaker(cur: sqlite3.Cursor, name: str) -> int:
-    """Get or create a speaker and return their ID. Cached to avoid duplicate operations."""
+    """Get or create a speaker and return their ID."""
     # First try to find existing speaker
     cur.execute("SELECT id FROM speakers WHERE name = ?", (name,))
     result = cur.fetchone()
@@ -261,9 +693,8 @@ def get_or_create_speaker(cur: sqlite3.Cursor, name: str) -> int:
     return cur.lastrowid
 
 
-@functools.cache
 def get_or_create_organization(cur: sqlite3.Cursor, name: str, rank: int) -> int:
-    """Get or create an organization and return their ID. Cached to avoid duplicate operations."""
+    """Get or create an organization and return their ID."""
     # First try to find existing organization
     cur.execute("SELECT id FROM organizations WHERE name = ?", (name,))
     result = cur.fetchone()
@@ -275,9 +706,8 @@ def get_or_create_organization(cur: sqlite3.Cursor, name: str, rank: int) -> int
     return cur.lastrowid
 
 
-@functools.cache
 def get_or_create_calling(cur: sqlite3.Cursor, name: str, organization_id: int, rank: int) -> int:
-    """Get or create a calling and return their ID. Cached to avoid duplicate operations."""
+    """Get or create a calling and return their ID."""
     # First try to find existing calling
     cur.execute("SELECT id FROM callings WHERE name = ? AND organization = ?", (name, organization_id))
     result = cur.fetchone()
@@ -289,9 +719,8 @@ def get_or_create_calling(cur: sqlite3.Cursor, name: str, organization_id: int,
     return cur.lastrowid
 
 
-@functools.cache
 def get_or_create_conference(cur: sqlite3.Cursor, year: int, season: str) -> int:
-    """Get or create a conference and return their ID. Cached to avoid duplicate operations."""
+    """Get or create a conference and return their ID."""
     # First try to find existing conference
     cur.execute("SELECT id FROM conferences WHERE year = ? AND season = ?", (year, season))
     result = cur.fetchone()
@@ -303,9 +732,8 @@ def get_or_create_conference(cur: sqlite3.Cursor, year: int, season: str) -> int
     return cur.lastrowid
 
 
-@functools.cache
 def get_or_create_session(cur: sqlite3.Cursor, name: str) -> int:
-    """Get or create a session and return their ID. Cached to avoid duplicate operations."""
+    """Get or create a session and return their ID."""
     # First try to find existing conference
     cur.execute("SELECT id FROM sessions WHERE name = ?", (name,))
     result = cur.fetchone()
@@ -334,130 +762,442 @@ def get_or_create_session(cur: sqlite3.Cursor, name: str) -> int:
     return cur.lastrowid
 
 
-@functools.cache
-def get_or_create_talk(cur: sqlite3.Cursor, title: str, conference_id: int, emeritus: int) -> tuple[int, bool]:
-    """Get or create a talk and return their ID and whether it was newly created. Cached to avoid duplicate operations.
+# Most IDs kept per dimension table. Far more than General Conference has speakers, callings or sessions, so in practice
+# every ID stays cached, but a database with unexpected data can't grow the cache without bound.
+DEFAULT_DIMENSION_CACHE_SIZE = 50_000
 
-    Returns:
-        tuple: (talk_id, is_new) where is_new is True if the talk was just inserted
+
+class DimensionCache:
+    """Bounded cache of the IDs of dimension rows (speakers, organizations, callings, conferences and sessions).
+
+    Each table keeps its most recently used IDs in an LRU map that is pre-warmed with one SELECT per table, so resolving
+    a dimension only touches the database when it has to be created. A cache belongs to a single connection (see
+    ScraperConnection) and must be invalidated if that connection rolls back rows it created.
     """
-    # First try to find existing talk
-    cur.execute("SELECT id FROM talks WHERE title = ? AND conference = ?", (title, conference_id))
-    result = cur.fetchone()
-    if result:
-        return result[0], False  # Talk exists, not new
 
-    # If not found, insert new talk
-    cur.execute("INSERT INTO talks (title, emeritus, conference) VALUES (?, ?, ?)", (title, emeritus, conference_id))
-    return cur.lastrowid, True  # Talk is new
+    TABLES = ("speakers", "organizations", "callings", "conferences", "sessions")
+
+    def __init__(self, con: sqlite3.Connection, max_size: int = DEFAULT_DIMENSION_CACHE_SIZE):
+        self.con = con
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._ids: dict[str, OrderedDict] = {table: OrderedDict() for table in self.TABLES}
+        self.warm()
+
+    def warm(self) -> None:
+        """Load the IDs of every existing dimension row."""
+        cur = self.con.cursor()
+        self._put_all("speakers", ((name, id) for id, name in cur.execute("SELECT id, name FROM speakers")))
+        self._put_all("organizations", ((name, id) for id, name in cur.execute("SELECT id, name FROM organizations")))
+        self._put_all(
+            "callings",
+            (((name, org), id) for id, name, org in cur.execute("SELECT id, name, organization FROM callings")),
+        )
+        self._put_all(
+            "conferences",
+            (((year, season), id) for id, year, season in cur.execute("SELECT id, year, season FROM conferences")),
+        )
+        self._put_all("sessions", ((name, id) for id, name in cur.execute("SELECT id, name FROM sessions")))
+
+    def invalidate(self, table: str | None = None) -> None:
+        """Forget the cached IDs of one table (or all of them), e.g. after a rollback."""
+        for name in [table] if table else self.TABLES:
+            self._ids[name].clear()
+
+    def _put_all(self, table: str, items) -> None:
+        for key, id in items:
+            self._put(table, key, id)
+
+    def _put(self, table: str, key, id: int) -> None:
+        ids = self._ids[table]
+        ids[key] = id
+        ids.move_to_end(key)
+        if len(ids) > self.max_size:
+            ids.popitem(last=False)
+
+    def _get(self, table: str, key) -> int | None:
+        ids = self._ids[table]
+        id = ids.get(key)
+        if id is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        ids.move_to_end(key)
+        return id
+
+    def speaker(self, name: str) -> int:
+        id = self._get("speakers", name)
+        if id is None:
+            id = get_or_create_speaker(self.con.cursor(), name)
+            self._put("speakers", name, id)
+        return id
+
+    def organization(self, name: str, rank: int) -> int:
+        id = self._get("organizations", name)
+        if id is None:
+            id = get_or_create_organization(self.con.cursor(), name, rank)
+            self._put("organizations", name, id)
+        return id
+
+    def calling(self, name: str, organization_id: int, rank: int) -> int:
+        key = (name, organization_id)
+        id = self._get("callings", key)
+        if id is None:
+            id = get_or_create_calling(self.con.cursor(), name, organization_id, rank)
+            self._put("callings", key, id)
+        return id
+
+    def conference(self, year: int | str, season: str) -> int:
+        # Scraped years are strings but the column stores integers
+        key = (int(year), season)
+        id = self._get("conferences", key)
+        if id is None:
+            id = get_or_create_conference(self.con.cursor(), *key)
+            self._put("conferences", key, id)
+        return id
+
+    def session(self, name: str) -> int:
+        id = self._get("sessions", name)
+        if id is None:
+            id = get_or_create_session(self.con.cursor(), name)
+            self._put("sessions", name, id)
+        return id
+
+
+class LatestCallingIndex:
+    """Each speaker's most recent calling, used to fill in the calling of talks that don't list one.
+
+    "Most recent" means the calling of the speaker's talk with the highest (year, season, talk ID), matching the order
+    talks are loaded in. The index is pre-warmed with a single query and then kept up to date as talks are inserted, so
+    looking up a speaker's calling is a dictionary lookup rather than a join over the talks.
+    """
+
+    def __init__(self, con: sqlite3.Connection):
+        self.con = con
+        # speaker ID -> ((year, season, talk ID), calling ID)
+        self._latest: dict[int, tuple[tuple[int, str, int], int]] = {}
+        self.warm()
+
+    def warm(self) -> None:
+        """Rebuild the index from the talks already in the database."""
+        self._latest.clear()
+        rows = self.con.execute("""
+            SELECT ts.speaker, c.year, c.season, t.id, tcl.calling
+            FROM talk_speakers ts
+            JOIN talk_callings tcl ON ts.talk = tcl.talk
+            JOIN talks t ON ts.talk = t.id
+            JOIN conferences c ON t.conference = c.id
+        """)
+        for speaker_id, year, season, talk_id, calling_id in rows:
+            self.update(speaker_id, (year, season, talk_id), calling_id)
+
+    def update(self, speaker_id: int, key: tuple[int, str, int], calling_id: int) -> None:
+        """Record that the speaker gave the talk identified by (year, season, talk ID) with the given calling."""
+        latest = self._latest.get(speaker_id)
+        if latest is None or key > latest[0]:
+            self._latest[speaker_id] = (key, calling_id)
+
+    def get(self, speaker_id: int) -> int | None:
+        """The calling ID of the speaker's most recent talk, if any of their talks has one."""
+        latest = self._latest.get(speaker_id)
+        return latest[1] if latest else None
+
+
+class ScraperConnection(sqlite3.Connection):
+    """SQLite connection that owns the in-memory indexes used while loading talks into it."""
+
+    _dimensions: DimensionCache | None = None
+    _latest_callings: LatestCallingIndex | None = None
+    _text_codec: TextCodec | None = None
+
+    def rollback(self) -> None:
+        """Roll back, forgetting the cached IDs and callings of any rows that were just undone."""
+        super().rollback()
+        if self._dimensions is not None:
+            self._dimensions.invalidate()
+        self._latest_callings = None
+
+    @property
+    def text_codec(self) -> TextCodec:
+        """The codec for compressed talk texts, loaded with the database's dictionaries on first use."""
+        if self._text_codec is None:
+            self._text_codec = TextCodec(
+                dict(self.execute("SELECT dict_id, dictionary FROM text_dictionaries ORDER BY id"))
+            )
+        return self._text_codec
+
+    @property
+    def dimensions(self) -> DimensionCache:
+        """The connection's dimension ID cache, created (and pre-warmed) on first use."""
+        if self._dimensions is None:
+            self._dimensions = DimensionCache(self)
+        return self._dimensions
+
+    @property
+    def latest_callings(self) -> LatestCallingIndex:
+        """The connection's speaker to most recent calling index, created (and pre-warmed) on first use."""
+        if self._latest_callings is None:
+            self._latest_callings = LatestCallingIndex(self)
+        return self._latest_callings
+
+
+def register_text_functions(con: ScraperConnection) -> None:
+    """Register the talk_text(text) SQL function, which decompresses a compressed talk text (other values pass through).
+
+    Any connection reading talk_texts_plain or the full-text index of a database with compressed texts needs it.
+    """
+    con.create_function("talk_text", 1, con.text_codec.decode, deterministic=True)
+
 
+def compress_talk_texts(cur: sqlite3.Cursor, enable: bool = False) -> int | None:
+    """Compress every talk text that isn't compressed yet into a zstd BLOB.
 
-def insert_data_with_topics(cur: sqlite3.Cursor, row: pd.Series, topic_client: Groq | None = None) -> bool:
-    """Insert a single talk's data into the database, optionally extracting topics if new.
+    The first time, a dictionary is trained on the uncompressed texts and the talk_texts_plain view and full-text index
+    triggers switch to decompressing texts with talk_text(). After that the database stays compressed, so texts added
+    by later runs are compressed too. `enable` turns compression on for a database that isn't compressed yet.
+
+    Returns:
+        The number of texts compressed, or None if the database doesn't compress its texts
+    """
+    codec = cur.connection.text_codec
+    if not codec.dictionaries:
+        if not enable:
+            return None
+        ensure_zstd_available()
+        samples = [text for (text,) in cur.execute("SELECT text FROM talk_texts WHERE typeof(text) = 'text'")]
+        if len(samples) < MIN_TRAINING_SAMPLES:
+            logger.warning(f"Not compressing talk texts: {len(samples)} aren't enough to train a dictionary")
+            return None
+
+        logger.info(f"Training a compression dictionary on {len(samples)} talk texts")
+        dict_id, dictionary = train_dictionary(samples)
+        cur.execute("INSERT INTO text_dictionaries (dict_id, dictionary) VALUES (?, ?)", (dict_id, dictionary))
+        codec.add_dictionary(dict_id, dictionary)
+        create_talk_text_readers(cur, compressed=True)
+
+    texts = cur.execute("SELECT id, text FROM talk_texts WHERE typeof(text) = 'text'").fetchall()
+    cur.executemany("UPDATE talk_texts SET text = ? WHERE id = ?", [(codec.compress(text), id) for id, text in texts])
+    return len(texts)
+
+
+def insert_talks(cur: sqlite3.Cursor, talks: list[Talk]) -> tuple[int, list[str]]:
+    """Bulk load a batch of scraped talks.
+
+    All dimension IDs (conferences, sessions, speakers, organizations, callings) are resolved up front through the
+    connection's DimensionCache, so the cursor must belong to a ScraperConnection (as returned by setup_sql). Existing
+    talks are found with a single query, and the new talks and their junction rows are written with executemany.
+    Nothing is committed, so the caller decides how large each transaction is. Talks must be given in the order they
+    should be stored in, since a talk without a calling inherits its speaker's most recent calling from the talks before
+    it (tracked by the connection's LatestCallingIndex).
 
     Args:
         cur: Database cursor
-        row: Pandas Series containing talk data
-        topic_client: Groq client for topic extraction (if None, skips topic extraction)
+        talks: Scraped talks
 
     Returns:
-        bool: True if the talk was newly inserted, False if it already existed
-
-    Raises:
-        Exception: If topic extraction is required but fails, preventing talk insertion
+        tuple: (new_talks, failed_urls) the number of newly inserted talks and the URLs of talks that couldn't be loaded
     """
     logger = logging.getLogger(__name__)
+    failed_urls = []
+    dimensions = cur.connection.dimensions
+
+    # Resolve every dimension ID before touching the talks themselves
+    resolved = []
+    for talk in talks:
+        try:
+            conference_id = dimensions.conference(talk.year, talk.season)
+            session_id = dimensions.session(talk.session)
+
+            speaker_name = get_speaker(talk.speaker)
+            speaker_id = dimensions.speaker(speaker_name) if speaker_name else None
+
+            calling_obj = Calling(talk.calling)
+            calling_id = None
+            if calling_obj:
+                org_id = dimensions.organization(calling_obj.organization, calling_obj.org_rank)
+                calling_id = dimensions.calling(calling_obj.name, org_id, calling_obj.rank)
+            elif not speaker_id:
+                logger.warning(f"Talk has no calling and no speaker: {talk.title} ({talk.year} {talk.season})")
+            emeritus = 1 if calling_obj and calling_obj.emeritus else 0
+        except Exception as e:
+            logger.exception(f"Failed to process talk '{talk.title}' ({talk.year} {talk.season}): {e}")
+            failed_urls.append(talk.url)
+            continue
+        resolved.append((talk, conference_id, session_id, speaker_id, calling_id, emeritus))
+
+    # Find which talks already exist with one query per batch instead of one per talk
+    conference_ids = sorted({row[1] for row in resolved})
+    placeholders = ",".join("?" * len(conference_ids))
+    existing = set(
+        cur.execute(f"SELECT title, conference FROM talks WHERE conference IN ({placeholders})", conference_ids)
+    )
 
-    # Get or create conference
-    conference_id = get_or_create_conference(cur, row.year, row.season)
-
-    session_id = get_or_create_session(cur, row.session)
-
-    # Get speaker information early (needed for calling lookup)
-    speaker_name = get_speaker(row.speaker)
-    speaker_id = None
-    if speaker_name:
-        speaker_id = get_or_create_speaker(cur, speaker_name)
-
-    # Get or create organization and calling
-    calling_obj = Calling(row.calling)
-    calling_id = None
-
-    if calling_obj:
-        org_id = get_or_create_organization(cur, calling_obj.organization, calling_obj.org_rank)
-        calling_id = get_or_create_calling(cur, calling_obj.name, org_id, calling_obj.rank)
-    elif speaker_id:
-        # Look up the most recent calling for this speaker from the database
-        most_recent_calling = cur.execute(
-            """
-            SELECT cl.id, cl.name, cl.organization, cl.rank, o.name as org_name, o.rank as org_rank
-            FROM talk_speakers ts
-            JOIN talk_callings tcl ON ts.talk = tcl.talk
-            JOIN callings cl ON tcl.calling = cl.id
-            JOIN organizations o ON cl.organization = o.id
-            JOIN talks t ON ts.talk = t.id
-            JOIN conferences c ON t.conference = c.id
-            WHERE ts.speaker = ?
-            ORDER BY c.year DESC, c.season DESC, t.id DESC
-            LIMIT 1
-        """,
-            (speaker_id,),
-        ).fetchone()
+    new_talks = []
+    for talk, conference_id, *ids in resolved:
+        key = (talk.title, conference_id)
+        if key in existing:
+            continue  # Talk already exists, no need to process
+        existing.add(key)
+        new_talks.append((talk, conference_id, *ids))
 
-        if most_recent_calling:
-            calling_id = most_recent_calling[0]
-            logger.debug(
-                f"Using most recent calling for {speaker_name}: {most_recent_calling[1]} ({most_recent_calling[4]})"
-            )
+    if not new_talks:
+        return 0, failed_urls
+
+    cur.executemany(
+        "INSERT INTO talks (title, emeritus, conference) VALUES (?, ?, ?)",
+        [(talk.title, emeritus, conference_id) for talk, conference_id, _, _, _, emeritus in new_talks],
+    )
+    talk_ids = {
+        (title, conference): talk_id
+        for talk_id, title, conference in cur.execute(
+            f"SELECT id, title, conference FROM talks WHERE conference IN ({placeholders})", conference_ids
+        )
+    }
+
+    # Talks without a calling take their speaker's most recent calling from the talks stored before them. New talks get
+    # increasing IDs in the order given, so walking them in that order while updating the index means an inherited
+    # calling is visible to the speaker's following talks too.
+    latest_callings = cur.connection.latest_callings
+    speakers, callings, texts, urls, sessions = [], [], [], [], []
+    for talk, conference_id, session_id, speaker_id, calling_id, _ in new_talks:
+        talk_id = talk_ids[(talk.title, conference_id)]
+        if speaker_id:
+            speakers.append((talk_id, speaker_id))
         else:
-            debug_info = f"{row.title} ({row.year} {row.season}) - {speaker_name}"
-            logger.warning(f"Talk has no calling and no previous calling found for speaker: {debug_info}")
-    else:
-        logger.warning(f"Talk has no calling and no speaker: {row.title} ({row.year} {row.season})")
+            logger.warning(f"Talk has no speaker: {talk.title} ({talk.year} {talk.season})")
+        if not calling_id and speaker_id:
+            calling_id = latest_callings.get(speaker_id)
+            if calling_id:
+                logger.debug(f"Using most recent calling for {get_speaker(talk.speaker)}: calling {calling_id}")
+            else:
+                debug_info = f"{talk.title} ({talk.year} {talk.season}) - {get_speaker(talk.speaker)}"
+                logger.warning(f"Talk has no calling and no previous calling found for speaker: {debug_info}")
+        if calling_id:
+            callings.append((talk_id, calling_id))
+            if speaker_id:
+                latest_callings.update(speaker_id, (int(talk.year), talk.season, talk_id), calling_id)
+        if talk.talk is not None:
+            texts.append((talk_id, talk.talk))
+        urls.append((talk_id, talk.url))
+        sessions.append((talk_id, session_id))
 
-    # Check if talk already exists BEFORE extracting topics (saves API calls)
-    emeritus = 1 if calling_obj and calling_obj.emeritus else 0
-    existing_talk = cur.execute(
-        "SELECT id FROM talks WHERE title = ? AND conference = ?", (row.title, conference_id)
-    ).fetchone()
+    cur.executemany("INSERT OR IGNORE INTO talk_speakers (talk, speaker) VALUES (?, ?)", speakers)
+    cur.executemany("INSERT OR IGNORE INTO talk_callings (talk, calling) VALUES (?, ?)", callings)
+    cur.executemany("INSERT INTO talk_texts (talk, text) VALUES (?, ?)", texts)
+    cur.executemany("INSERT INTO talk_urls (talk, url, kind) VALUES (?, ?, 'text')", urls)
+    cur.executemany("INSERT OR IGNORE INTO talk_sessions (talk, session) VALUES (?, ?)", sessions)
+
+    return len(new_talks), failed_urls
+
+
+# Millisecond timestamps, so jobs attempted within the same second as a run started still sort before or after it
+TOPIC_JOB_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def enqueue_topic_jobs(cur: sqlite3.Cursor) -> int:
+    """Queue topic extraction for every talk with a text that has no topics yet and isn't queued already.
+
+    Returns:
+        The number of newly queued talks
+    """
+    cur.execute("""
+        INSERT INTO topic_jobs (talk)
+        SELECT DISTINCT tt.talk FROM talk_texts tt
+        WHERE NOT EXISTS (SELECT 1 FROM topic_jobs j WHERE j.talk = tt.talk)
+            AND NOT EXISTS (SELECT 1 FROM talk_topics tp WHERE tp.talk = tt.talk)
+    """)
+    return cur.rowcount
 
-    if existing_talk:
-        return False  # Talk already exists, no need to process
 
-    # Talk is new - extract topics FIRST before inserting anything
-    topics = []
-    if topic_client and pd.notna(row.talk) and row.talk.strip():
-        # Extract topics before inserting talk - if this fails, we don't insert the talk
-        topics = topic_extractor.extract_topics_groq(row.talk.strip(), topic_client)
-        logger.debug(f"Extracted {len(topics)} topics for talk: {row.title}")
+def reset_topic_jobs(cur: sqlite3.Cursor, retry_failed: bool = False) -> int:
+    """Put jobs left running by an interrupted run (and optionally failed jobs, with fresh attempts) back to pending.
 
-    # Now insert the talk and all related data
+    Returns:
+        The number of jobs put back in the queue
+    """
     cur.execute(
-        "INSERT INTO talks (title, emeritus, conference) VALUES (?, ?, ?)", (row.title, emeritus, conference_id)
+        """
+        UPDATE topic_jobs
+        SET status = 'pending', attempts = CASE WHEN status = 'failed' THEN 0 ELSE attempts END,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE status = 'running' OR (? AND status = 'failed')
+        """,
+        (retry_failed,),
     )
-    talk_id = cur.lastrowid
+    return cur.rowcount
 
-    # Associate speaker with talk (already have speaker_id from above)
-    if speaker_id:
-        cur.execute("INSERT OR IGNORE INTO talk_speakers (talk, speaker) VALUES (?, ?)", (talk_id, speaker_id))
-    else:
-        logger.warning(f"Talk has no speaker: {row.title} ({row.year} {row.season})")
 
-    if calling_id:
-        cur.execute("INSERT OR IGNORE INTO talk_callings (talk, calling) VALUES (?, ?)", (talk_id, calling_id))
+def topic_job_clock(cur: sqlite3.Cursor) -> str:
+    """The current time in the format of topic_jobs.last_attempt_at, e.g. to mark the start of a run."""
+    return cur.execute(f"SELECT {TOPIC_JOB_NOW}").fetchone()[0]
+
 
-    # Insert talk text
-    cur.execute("INSERT INTO talk_texts (talk, text) VALUES (?, ?)", (talk_id, row.talk))
+def claim_topic_jobs(cur: sqlite3.Cursor, limit: int, attempted_before: str | None = None) -> list[tuple[int, str]]:
+    """Mark up to `limit` pending jobs as running, counting the attempt, and return their talk IDs and texts.
+
+    Args:
+        attempted_before: Only claim jobs that haven't been attempted since this topic_job_clock() time, so a run
+            started at that time doesn't immediately retry the jobs that already failed in it
+    """
+    jobs = cur.execute(
+        """
+        SELECT j.talk, tt.text FROM topic_jobs j
+        JOIN talk_texts_plain tt ON tt.talk = j.talk
+        WHERE j.status = 'pending' AND (j.last_attempt_at IS NULL OR ?1 IS NULL OR j.last_attempt_at < ?1)
+        ORDER BY j.talk
+        LIMIT ?2
+        """,
+        (attempted_before, limit),
+    ).fetchall()
+    cur.executemany(
+        f"""
+        UPDATE topic_jobs
+        SET status = 'running', attempts = attempts + 1, last_attempt_at = {TOPIC_JOB_NOW},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE talk = ?
+        """,
+        [(talk_id,) for talk_id, _ in jobs],
+    )
+    return jobs
 
-    # Insert talk URL
-    cur.execute("INSERT INTO talk_urls (talk, url, kind) VALUES (?, ?, 'text')", (talk_id, row.url))
 
-    # Insert talk session
-    cur.execute("INSERT OR IGNORE INTO talk_sessions (talk, session) VALUES (?, ?)", (talk_id, session_id))
+def release_topic_jobs(cur: sqlite3.Cursor, talk_ids: list[int]) -> None:
+    """Put claimed jobs back to pending without counting the attempt, e.g. when the API rejected the credentials."""
+    cur.executemany(
+        """
+        UPDATE topic_jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), updated_at = CURRENT_TIMESTAMP
+        WHERE talk = ? AND status = 'running'
+        """,
+        [(talk_id,) for talk_id in talk_ids],
+    )
+
+
+def complete_topic_job(cur: sqlite3.Cursor, talk_id: int, topics: list[str]) -> None:
+    """Store a talk's extracted topics and mark its job done."""
+    cur.executemany(
+        "INSERT OR IGNORE INTO talk_topics (talk, name) VALUES (?, ?)",
+        [(talk_id, topic.strip()) for topic in topics if topic.strip()],
+    )
+    cur.execute(
+        "UPDATE topic_jobs SET status = 'done', error = NULL, updated_at = CURRENT_TIMESTAMP WHERE talk = ?",
+        (talk_id,),
+    )
+
+
+def fail_topic_job(cur: sqlite3.Cursor, talk_id: int, error: str, max_attempts: int) -> None:
+    """Record a failed attempt, leaving the job pending for a later run unless it has used up `max_attempts`."""
+    cur.execute(
+        """
+        UPDATE topic_jobs
+        SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ?,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE talk = ?
+        """,
+        (max_attempts, error, talk_id),
+    )
 
-    # Insert topics (already extracted above)
-    for topic in topics:
-        if topic.strip():
-            cur.execute("INSERT OR IGNORE INTO talk_topics (talk, name) VALUES (?, ?)", (talk_id, topic.strip()))
 
-    return True  # Talk was newly inserted
+def count_topic_jobs(cur: sqlite3.Cursor) -> dict[str, int]:
+    """Count the queued topic extraction jobs by status."""
+    return dict(cur.execute("SELECT status, COUNT(*) FROM topic_jobs GROUP BY status"))
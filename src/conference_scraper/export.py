@@ -0,0 +1,121 @@
+"""Streaming writers for the JSON exports of the scraped talks."""
+
+import json
+import logging
+import os
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class JsonBackend(str, Enum):
+    """Serializer used to encode the exported records.
+
+    The standard library's json module escapes non-ASCII characters. orjson is several times faster and writes UTF-8
+    as is.
+    """
+
+    json = "json"
+    orjson = "orjson"
+
+
+def ensure_json_backend_available(backend: JsonBackend) -> None:
+    """Raise an ImportError up front if the optional dependencies for a JSON backend aren't installed."""
+    try:
+        if backend == JsonBackend.orjson:
+            import orjson  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            f"The {backend.value} JSON backend requires optional dependencies. Install them with: uv sync --extra "
+            "fast-json"
+        ) from e
+
+
+def _encoder(backend: JsonBackend, indent: bool) -> Callable[[Mapping[str, Any]], bytes]:
+    """An encoder turning one record into bytes, with sorted keys and optionally indented by two spaces."""
+    if backend == JsonBackend.orjson:
+        import orjson
+
+        option = orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return lambda record: orjson.dumps(record, option=option)
+
+    encoder = json.JSONEncoder(indent=2 if indent else None, sort_keys=True)
+    return lambda record: encoder.encode(record).encode()
+
+
+class JsonWriter:
+    """Writes records to a JSON array, or newline-delimited JSON, one at a time as they are produced.
+
+    With the json backend the array is byte for byte what `json.dump(records, f, indent=2, sort_keys=True)` writes.
+    The file is written under a temporary name and only replaces `path` once the writer is closed without an error, so
+    an interrupted export never clobbers the previous one.
+    """
+
+    def __init__(self, path: Path, backend: JsonBackend = JsonBackend.json, ndjson: bool = False):
+        self.path = path
+        self.ndjson = ndjson
+        self.count = 0
+        self._encode = _encoder(backend, indent=not ndjson)
+        self._tmp_path = path.with_name(f".{path.name}.tmp")
+        self._file = open(self._tmp_path, "wb")
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        if self.ndjson:
+            self._file.write(self._encode(record))
+            self._file.write(b"\n")
+        else:
+            self._file.write(b"[\n  " if self.count == 0 else b",\n  ")
+            # Nest the record's lines one level into the array
+            self._file.write(self._encode(record).replace(b"\n", b"\n  "))
+        self.count += 1
+
+    def write_all(self, records: Iterable[Mapping[str, Any]]) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        """Finish the file and move it into place."""
+        if not self.ndjson:
+            self._file.write(b"\n]" if self.count else b"[]")
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self) -> None:
+        """Abandon the export, leaving any previous file at `path` untouched."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "JsonWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def write_json(records: Iterable[Mapping[str, Any]], path: Path, backend: JsonBackend = JsonBackend.json) -> int:
+    """Write records as a JSON array, one record at a time (see JsonWriter).
+
+    Returns:
+        The number of records written
+    """
+    with JsonWriter(path, backend) as writer:
+        writer.write_all(records)
+    return writer.count
+
+
+def write_ndjson(records: Iterable[Mapping[str, Any]], path: Path, backend: JsonBackend = JsonBackend.json) -> int:
+    """Write records as newline-delimited JSON (one compact record per line).
+
+    Returns:
+        The number of records written
+    """
+    with JsonWriter(path, backend, ndjson=True) as writer:
+        writer.write_all(records)
+    return writer.count
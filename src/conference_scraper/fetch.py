@@ -0,0 +1,127 @@
+"""Pooled HTTP client shared by all scraping functions."""
+
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import ResponseCache
+from .config import DEFAULT_MAX_RATE, DEFAULT_MAX_RETRIES, DEFAULT_WORKERS
+from .ratelimit import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+
+# Keep-alive connections kept open per host. Sized to match the default number of scraping workers.
+DEFAULT_POOL_SIZE = DEFAULT_WORKERS
+DEFAULT_TIMEOUT = 30.0
+
+# Statuses worth retrying: throttling and transient server/gateway failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchClient:
+    """Thread-safe HTTP client that reuses keep-alive connections through a pooled requests.Session."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: ResponseCache | None = None,
+        max_rate: float = DEFAULT_MAX_RATE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cache = cache
+        self.max_retries = max_retries
+        self.limiter = AdaptiveRateLimiter(max_rate=max_rate, max_concurrency=pool_size)
+        self.session = requests.Session()
+        # pool_maxsize caps the connections kept per host and pool_block stops extra workers from opening throwaway
+        # connections beyond that limit (they wait for a pooled one instead)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url: str) -> bytes:
+        """GET a URL (following redirects) and return the raw response body.
+
+        Requests are throttled per host by the adaptive rate limiter. Connection errors, timeouts and retryable
+        statuses (429/5xx) are retried up to `max_retries` times with jittered exponential backoff, honoring any
+        Retry-After header. When a cache is configured, previously seen pages are revalidated with a conditional
+        request and served from disk if the server answers 304 Not Modified.
+
+        Raises:
+            requests.RequestException: If the request still fails or returns an error status after all retries
+        """
+        logger = logging.getLogger(__name__)
+        host = urlsplit(url).netloc
+        entry = self.cache.lookup(url) if self.cache else None
+        headers = entry.conditional_headers() if entry else None
+
+        attempt = 0
+        while True:
+            try:
+                with self.limiter.limit(host):
+                    r = self.session.get(url, headers=headers, allow_redirects=True, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.debug(f"Retrying {url} in {delay:.1f}s after {e}")
+            else:
+                if r.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    break
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                if r.status_code == requests.codes.too_many_requests:
+                    self.limiter.throttled(host, retry_after)
+                delay = retry_after if retry_after is not None else backoff_delay(attempt)
+                logger.debug(f"Retrying {url} in {delay:.1f}s after HTTP {r.status_code}")
+            time.sleep(delay)
+            attempt += 1
+
+        if entry and r.status_code == requests.codes.not_modified:
+            self.limiter.succeeded(host)
+            logger.debug(f"Not modified, using cached copy of {url}")
+            return self.cache.read(entry)
+
+        r.raise_for_status()
+        self.limiter.succeeded(host)
+        logger.debug(f"Successfully fetched {r.url}")
+        if self.cache:
+            self.cache.store(url, r.content, r.headers)
+        return r.content
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: FetchClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FetchClient:
+    """Return the shared fetch client, creating it with default settings on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FetchClient()
+        return _client
+
+
+def configure_client(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: ResponseCache | None = None,
+    max_rate: float = DEFAULT_MAX_RATE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> FetchClient:
+    """Replace the shared fetch client, e.g. to size its connection pool to the number of workers."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = FetchClient(
+            pool_size=pool_size, timeout=timeout, cache=cache, max_rate=max_rate, max_retries=max_retries
+        )
+        return _client
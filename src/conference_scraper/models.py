@@ -3,6 +3,8 @@
 import logging
 import re
 import unicodedata
+from dataclasses import dataclass, fields
+from typing import Any, Mapping
 
 calling_re = re.compile(
     r"(?P<emeritus>(recently\s)?((emeritus|released|former)\s)?((as|member\sof\sthe)\s)?)(?P<calling>[\w,\s()\d-]+)$",
@@ -151,3 +153,32 @@ def get_speaker(full_speaker: str | None) -> str | None:
     else:
         logger.warning(f"Failed speaker match: {speaker}")
     return unicodedata.normalize("NFD", speaker)
+
+
+@dataclass(slots=True)
+class Talk:
+    """A talk scraped from a conference. The field names are the keys of the JSON export."""
+
+    title: str
+    speaker: str | None
+    calling: str | None
+    year: str
+    season: str
+    url: str
+    talk: str | None  # The talk's text
+    session: str
+
+    def sort_key(self) -> tuple[str, str, str, str, str]:
+        """The order talks are exported and stored in: year, season, url, speaker, title."""
+        return self.year, self.season, self.url, self.speaker or "", self.title or ""
+
+    def to_dict(self) -> dict[str, str | None]:
+        return {field: getattr(self, field) for field in TALK_FIELDS}
+
+    @classmethod
+    def from_dict(cls, record: Mapping[str, Any]) -> "Talk":
+        """Read a talk back from an exported record. Missing values written as NaN by older exports become None."""
+        return cls(**{field: value if isinstance(value := record.get(field), str) else None for field in TALK_FIELDS})
+
+
+TALK_FIELDS = tuple(field.name for field in fields(Talk))
@@ -0,0 +1,173 @@
+"""Rate limiting and retry helpers for talking politely to remote services."""
+
+import email.utils
+import logging
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows bursts of up to `capacity` and a sustained `rate` of tokens per second."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available and take them.
+
+        Requests larger than the bucket's capacity wait for a full bucket and then take it into debt, so they can't
+        wait forever and the following acquires make up for them.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                needed = min(tokens, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self, remaining: float = 0.0) -> None:
+        """Lower the bucket to at most `remaining` tokens (empty by default), e.g. to match what a server reports."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, remaining)
+
+
+class AdaptiveRateLimiter:
+    """Per-host request throttle that adapts to the server.
+
+    Every host gets a token bucket and a cap on concurrent requests. When a host answers 429 Too Many Requests its
+    rate is halved and it is paused for the Retry-After period; every successful request then nudges the rate back up
+    towards `max_rate` (additive increase, multiplicative decrease).
+
+    A burst of concurrent requests tends to be answered with a burst of 429s, which all report the same overload. So
+    the rate is halved at most once per cooldown window: the Retry-After period, or `cooldown` seconds if that is
+    shorter or missing. Further 429s within the window only extend the pause.
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        max_concurrency: int,
+        min_rate: float = 0.5,
+        increase: float = 0.1,
+        cooldown: float = 1.0,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.increase = increase
+        self.cooldown = cooldown
+        self._buckets: dict[str, TokenBucket] = defaultdict(lambda: TokenBucket(max_rate))
+        self._slots: dict[str, threading.BoundedSemaphore] = defaultdict(
+            lambda: threading.BoundedSemaphore(max_concurrency)
+        )
+        self._paused_until: dict[str, float] = defaultdict(float)
+        self._cooldown_until: dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, host: str) -> Iterator[None]:
+        """Hold one of the host's concurrency slots for the duration of a request, after waiting for a token."""
+        with self._lock:
+            bucket = self._buckets[host]
+            slots = self._slots[host]
+        with slots:
+            with self._lock:
+                pause = self._paused_until[host] - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            bucket.acquire()
+            yield
+
+    def throttled(self, host: str, retry_after: float | None = None) -> None:
+        """Record a 429 from the host: pause it for `retry_after` seconds and halve its rate unless cooling down."""
+        with self._lock:
+            bucket = self._buckets[host]
+            now = time.monotonic()
+            if retry_after:
+                self._paused_until[host] = max(self._paused_until[host], now + retry_after)
+            decrease = now >= self._cooldown_until[host]
+            if decrease:
+                self._cooldown_until[host] = now + max(self.cooldown, retry_after or 0.0)
+                rate = max(self.min_rate, bucket.rate / 2)
+        bucket.drain()
+        if decrease:
+            bucket.set_rate(rate)
+            logger.warning(f"Throttled by {host}, slowing down to {rate:.2f} requests/second")
+        else:
+            logger.debug(f"Throttled by {host} again while cooling down, keeping {bucket.rate:.2f} requests/second")
+
+    def succeeded(self, host: str) -> None:
+        """Record a successful request, creeping the host's rate back up towards the maximum."""
+        with self._lock:
+            bucket = self._buckets[host]
+        if bucket.rate < self.max_rate:
+            bucket.set_rate(min(self.max_rate, bucket.rate + self.increase))
+
+    def rate(self, host: str) -> float:
+        with self._lock:
+            return self._buckets[host].rate
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse a duration like "7.66s", "2m59.56s" or "120ms" (as used in rate limit reset headers) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value.strip())
+    if not parts or "".join(number + unit for number, unit in parts) != value.strip():
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (either delay-seconds or an HTTP date) into seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -1,26 +1,51 @@
 """Web scraping functionality for conference talks."""
 
+import hashlib
+import json
 import logging
+import multiprocessing
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, TypeVar
 
 import requests
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+from .config import DEFAULT_WORKERS, Engine, Parser, current_logging_setup, setup_logging
+from .fetch import get_client
+from .models import Talk
 
-def get_soup(url: str) -> BeautifulSoup | None:
-    """Create a tree structure (BeautifulSoup) out of a GET request's HTML."""
+R = TypeVar("R")
+
+
+class TalkScrapeError(Exception):
+    """A talk page couldn't be fetched or parsed, as opposed to being skipped on purpose (e.g. a session or report)."""
+
+
+def fetch_page(url: str) -> bytes | None:
+    """Retrieve a page's raw HTML through the shared fetch client."""
     logger = logging.getLogger(__name__)
     try:
-        r = requests.get(url, allow_redirects=True)
-        r.raise_for_status()
-        logger.debug(f"Successfully fetched {r.url}")
-        return BeautifulSoup(r.content, "html5lib")
+        return get_client().fetch(url)
     except requests.RequestException as e:
         logger.error(f"Error fetching {url}: {e}")
         return None
+    except (OSError, ValueError) as e:
+        # e.g. an unreadable or corrupt response cache entry. One bad page shouldn't take the whole run down.
+        logger.warning(f"Error fetching {url}: {e!r}")
+        return None
+
+
+def get_soup(url: str, parser: Parser = Parser.html5lib) -> BeautifulSoup | None:
+    """Create a tree structure (BeautifulSoup) out of a GET request's HTML."""
+    content = fetch_page(url)
+    if content is None:
+        return None
+    return BeautifulSoup(content, parser.tree_builder)
 
 
 def is_decade_page(url: str) -> bool:
@@ -28,11 +53,11 @@ def is_decade_page(url: str) -> bool:
     return bool(re.search(r"/study/general-conference/\d{4}\d{4}", url))
 
 
-def scrape_conference_pages(main_page_url: str) -> list[str]:
+def scrape_conference_pages(main_page_url: str, executor: "ScrapeExecutor") -> list[str]:
     """Retrieve a list of URLs for each conference (year/month) from the main page."""
     logger = logging.getLogger(__name__)
     logger.info(f"Scraping conference pages from {main_page_url}")
-    soup = get_soup(main_page_url)
+    soup = get_soup(main_page_url, executor.parser)
     if soup is None:
         logger.error(f"Failed to fetch content from {main_page_url}")
         return []
@@ -47,10 +72,20 @@ def scrape_conference_pages(main_page_url: str) -> list[str]:
         if re.search(r"/study/general-conference/(\d{4}/(04|10)|\d{4}\d{4})", a["href"])
     ]
 
+    # Fetch every decade page at once, then splice their conferences back in where the decade link was
+    decade_links = [link for link in links if is_decade_page(link)]
+    decade_futures = [executor.submit(get_soup, link, executor.parser) for link in decade_links]
+    decade_soups = {
+        link: future.result()
+        for link, future in zip(
+            decade_links, tqdm(decade_futures, total=len(decade_links), desc="Scraping decade pages", unit="decades")
+        )
+    }
+
     for link in links:
         if is_decade_page(link):
             # Handle decade page
-            decade_soup = get_soup(link)
+            decade_soup = decade_soups[link]
             if decade_soup:
                 year_links = [
                     "https://www.churchofjesuschrist.org" + a["href"]
@@ -80,12 +115,12 @@ def normalize_session_name(name: str) -> str:
     return session_name.strip() if session_name else name.strip().title()
 
 
-def scrape_talk_urls(conference_url: str) -> dict[str, list[str]]:
+def scrape_talk_urls(conference_url: str, parser: Parser = Parser.html5lib) -> dict[str, list[str]]:
     """Retrieve a list of URLs for each talk in a specific conference."""
     logger = logging.getLogger(__name__)
-    soup = get_soup(conference_url)
+    soup = get_soup(conference_url, parser)
     if soup is None:
-        return []
+        return {}
 
     session_talks = {}
     # Select ONLY the <li> elements that:
@@ -160,22 +195,107 @@ def scrape_talk_urls(conference_url: str) -> dict[str, list[str]]:
     return session_talks
 
 
-def scrape_talk_data(session_url: tuple[str, str]) -> dict[str, str | None]:
-    """Scrapes a single talk for data such as: title, conference, calling, speaker, content."""
+def fingerprint_talk_urls(session_talks: dict[str, list[str]]) -> str:
+    """Hash a conference's normalized session -> talk links so changes to its index page can be detected cheaply."""
+    normalized = {session: sorted(set(urls)) for session, urls in session_talks.items()}
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+def scrape_talk_data(session_url: tuple[str, str], parser: Parser = Parser.html5lib) -> Talk | None:
+    """Scrapes a single talk for data such as: title, conference, calling, speaker, content.
+
+    Returns None for pages that aren't talks.
+
+    Raises:
+        TalkScrapeError: If the page couldn't be fetched or parsed
+    """
     session = session_url[0]
     url = session_url[1]
+    content = fetch_page(url)
+    if content is None:
+        raise TalkScrapeError("Could not fetch the page")
+    return parse_talk_data(session, url, content, parser)
+
+
+def _extract_talk_fields_bs4(
+    content: bytes, tree_builder: str
+) -> tuple[str | None, str | None, str | None, str | None]:
+    """Extract a talk page's (title, speaker, calling, text) using BeautifulSoup."""
+    soup = BeautifulSoup(content, tree_builder)
+
+    title_tag = soup.find("h1", {"id": "title1"})
+    if title_tag:
+        title = title_tag.text.strip()
+    else:
+        title_tag = soup.find("title")
+        title = title_tag.text.strip() if title_tag else None
+
+    author_tag = soup.find("p", {"class": "author-name"})
+    speaker = author_tag.text.strip() if author_tag else None
+
+    calling_tag = soup.find("p", {"class": "author-role"})
+    calling = calling_tag.text.strip() if calling_tag else None
+
+    content_array = soup.find("div", {"class": "body-block"})
+    text = "\n\n".join(paragraph.text.strip() for paragraph in content_array.find_all("p")) if content_array else None
+
+    return title, speaker, calling, text
+
+
+def _extract_talk_fields_selectolax(content: bytes) -> tuple[str | None, str | None, str | None, str | None]:
+    """Extract a talk page's (title, speaker, calling, text) using selectolax's lexbor engine.
+
+    Mirrors _extract_talk_fields_bs4 selector for selector so both backends produce identical fields.
+    """
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(content)
+
+    title_node = tree.css_first("h1#title1")
+    if title_node is None:
+        title_node = tree.css_first("title")
+    title = title_node.text().strip() if title_node else None
+
+    author_node = tree.css_first("p.author-name")
+    speaker = author_node.text().strip() if author_node else None
+
+    calling_node = tree.css_first("p.author-role")
+    calling = calling_node.text().strip() if calling_node else None
+
+    body_node = tree.css_first("div.body-block")
+    text = "\n\n".join(paragraph.text().strip() for paragraph in body_node.css("p")) if body_node else None
+
+    return title, speaker, calling, text
+
+
+# Tabs become four spaces and non-breaking spaces plain ones
+WHITESPACE_TABLE = str.maketrans({"\t": "    ", "\xa0": " "})
+
+
+def normalize_text(value: str | None) -> str | None:
+    """NFD-normalize a scraped string and clean up its whitespace."""
+    if value is None:
+        return None
+    # Most fields are plain ASCII, which is already normalized and has no non-breaking spaces
+    if value.isascii():
+        return value.translate(WHITESPACE_TABLE) if "\t" in value else value
+    return unicodedata.normalize("NFD", value).translate(WHITESPACE_TABLE)
+
+
+def parse_talk_data(session: str, url: str, content: bytes, parser: Parser = Parser.html5lib) -> Talk | None:
+    """Extracts a talk's data (with normalized text, see normalize_text) from its already downloaded HTML.
+
+    Safe to run in a separate process. Returns None for pages that aren't talks.
+
+    Raises:
+        TalkScrapeError: If the page couldn't be parsed
+    """
     logger = logging.getLogger(__name__)
     try:
-        soup = get_soup(url)
-        if soup is None:
-            return {}
-
-        title_tag = soup.find("h1", {"id": "title1"})
-        if title_tag:
-            title = title_tag.text.strip()
+        if parser == Parser.selectolax:
+            title, speaker, calling, text = _extract_talk_fields_selectolax(content)
         else:
-            title_tag = soup.find("title")
-            title = title_tag.text.strip() if title_tag else None
+            title, speaker, calling, text = _extract_talk_fields_bs4(content, parser.tree_builder)
 
         # Don't include full sessions, sustainings, reports, etc
         prefixes = [
@@ -203,40 +323,47 @@ def scrape_talk_data(session_url: tuple[str, str]) -> dict[str, str | None]:
             or any(include in title for include in includes)
             or any(title.endswith(suffix) for suffix in suffixes)
         ):
-            return {}
-
-        author_tag = soup.find("p", {"class": "author-name"})
-        speaker = author_tag.text.strip() if author_tag else None
-
-        calling_tag = soup.find("p", {"class": "author-role"})
-        calling = calling_tag.text.strip() if calling_tag else None
-
-        content_array = soup.find("div", {"class": "body-block"})
-        content = (
-            "\n\n".join(paragraph.text.strip() for paragraph in content_array.find_all("p")) if content_array else None
-        )
+            return None
 
         # Fix unsafe regex (line 134)
         year_match = re.search(r"/(\d{4})/", url)
         if not year_match:
             logger.error(f"Could not extract year from URL: {url}")
-            return {}
+            return None
         year = year_match.group(1)
         season = "April" if "/04/" in url else "October"
 
-        return {
-            "title": title,
-            "speaker": speaker,
-            "calling": calling,
-            "year": year,
-            "season": season,
-            "url": url,
-            "talk": content,
-            "session": session,
-        }
+        # Normalize here, in the worker, so the main process only has to store the talk. The year, season and URL come
+        # from the (ASCII) URL so they never need it.
+        return Talk(
+            title=normalize_text(title),
+            speaker=normalize_text(speaker),
+            calling=normalize_text(calling),
+            year=year,
+            season=season,
+            url=url,
+            talk=normalize_text(text),
+            session=normalize_text(session),
+        )
     except Exception as e:
-        logger.error(f"Failed to scrape {url}: {e}")
-        return {}
+        # Reported (with the URL) by whoever collects the scraped talks
+        raise TalkScrapeError(f"Could not parse the page: {e}") from None
+
+
+def remove_known_talks(
+    conferences: dict[str, dict[str, list[str]]], known_urls: set[str]
+) -> dict[str, dict[str, list[str]]]:
+    """Drop talk URLs that have already been scraped, along with any sessions and conferences left empty."""
+    remaining = {}
+    for key, sessions in conferences.items():
+        new_sessions = {}
+        for session, urls in sessions.items():
+            new_urls = [url for url in urls if url not in known_urls]
+            if new_urls:
+                new_sessions[session] = new_urls
+        if new_sessions:
+            remaining[key] = new_sessions
+    return remaining
 
 
 def flatten_talk_data(conferences: dict[str, dict[str, list[str]]]) -> list[tuple[str, str]]:
@@ -248,15 +375,159 @@ def flatten_talk_data(conferences: dict[str, dict[str, list[str]]]) -> list[tupl
     return talks
 
 
-def scrape_talk_data_parallel(conferences: dict[str, dict[str, list[str]]], total: int) -> list[dict[str, str | None]]:
-    """Scrapes all talks in parallel using ThreadPoolExecutor."""
-    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
-        results = list(
-            tqdm(
-                executor.map(scrape_talk_data, flatten_talk_data(conferences)),
-                total=total,
-                desc="Scraping talks in parallel",
-                unit="talks",
+class ScrapeExecutor:
+    """Runs page fetches and talk scrapes with one of the engines, handing back a Future for each submission.
+
+    threads: a thread pool does everything.
+    pipeline: threads fetch raw talk pages and a process pool parses them on every core. At most `max_pending`
+        downloaded pages wait on (or are in) the parse stage, so fetchers stall instead of buffering the corpus.
+    """
+
+    def __init__(
+        self,
+        engine: Engine = Engine.threads,
+        workers: int = DEFAULT_WORKERS,
+        parser: Parser = Parser.html5lib,
+        parse_workers: int | None = None,
+        max_pending: int | None = None,
+    ):
+        self.engine = engine
+        self.parser = parser
+        self.workers = workers
+        self._threads = ThreadPoolExecutor(max_workers=self.workers)
+        self._processes: ProcessPoolExecutor | None = None
+
+        if engine == Engine.pipeline:
+            parse_workers = parse_workers or os.cpu_count()
+            self._parse_slots = threading.BoundedSemaphore(max_pending or 4 * parse_workers)
+            # Spawn rather than fork since the fetcher threads may already be running when the pool starts its workers
+            self._processes = ProcessPoolExecutor(
+                max_workers=parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=setup_logging,
+                initargs=current_logging_setup(),
             )
-        )
-    return [result for result in results if result]  # Filter out empty results
+
+    def __enter__(self) -> "ScrapeExecutor":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        # On an error (or Ctrl-C) drop the queued scrapes rather than fetching the rest of the corpus first
+        self.shutdown(cancel=exc_type is not None)
+
+    def submit(self, func: Callable[..., R], *args) -> Future:
+        """Run a network-bound function (e.g. a page scrape) on the fetcher threads."""
+        return self._threads.submit(func, *args)
+
+    def submit_talk(self, session: str, url: str) -> Future:
+        """Scrape a single talk, resolving to the same Talk (or None, or TalkScrapeError) as scrape_talk_data."""
+        if self._processes is None:
+            return self.submit(scrape_talk_data, (session, url), self.parser)
+
+        talk = Future()
+
+        def parsed(parse_future: Future) -> None:
+            self._parse_slots.release()
+            try:
+                talk.set_result(parse_future.result())
+            except Exception as e:
+                talk.set_exception(e)
+
+        def fetch_and_hand_off() -> None:
+            try:
+                content = fetch_page(url)
+                if content is None:
+                    talk.set_exception(TalkScrapeError("Could not fetch the page"))
+                    return
+                # Blocks while the parse stage is full, so downloaded pages never pile up in memory
+                self._parse_slots.acquire()
+                self._processes.submit(parse_talk_data, session, url, content, self.parser).add_done_callback(parsed)
+            except Exception as e:
+                talk.set_exception(e)
+
+        self._threads.submit(fetch_and_hand_off)
+        return talk
+
+    def shutdown(self, cancel: bool = False) -> None:
+        """Stop the workers once every submission is done, or with `cancel` drop the ones that haven't started yet."""
+        self._threads.shutdown(wait=not cancel, cancel_futures=cancel)
+        if self._processes is not None:
+            self._processes.shutdown(wait=not cancel, cancel_futures=cancel)
+
+
+def conference_sort_key(conference_url: str) -> tuple[str, str]:
+    """Chronological (year, month) sort key for a conference index URL."""
+    match = re.search(r"/study/general-conference/(?P<year>\d{4})/(?P<month>04|10)", conference_url)
+    if not match:
+        raise ValueError(f"Not a conference URL: {conference_url}")
+    return match.group("year"), match.group("month")
+
+
+def stream_talk_data(
+    conference_urls: list[str],
+    executor: ScrapeExecutor,
+    select_talks: Callable[[str, dict[str, list[str]]], dict[str, list[str]]] | None = None,
+) -> Iterator[tuple[str, dict[str, list[str]], list[Talk], list[str]]]:
+    """Discover and scrape every conference's talks as one streaming pipeline.
+
+    Each conference's talks are handed to the talk scrapers as soon as its index page has been parsed, rather than
+    after every conference has been discovered. Conferences are yielded as (conference_url, sessions, talks,
+    failed_urls) in chronological order, each as soon as it and every earlier conference are finished, with its talks
+    sorted by Talk.sort_key. That keeps downstream output deterministic while only buffering conferences that finish
+    early. failed_urls lists the talk pages that couldn't be fetched or parsed, so the caller knows the conference is
+    incomplete (pages skipped on purpose, like sessions and reports, aren't failures).
+
+    Args:
+        conference_urls: The conference index pages to scrape
+        executor: Runs the discovery and talk scraping
+        select_talks: Optional filter called with each conference's discovered sessions, returning the sessions whose
+            talks should actually be scraped (e.g. to skip talks that are already stored)
+    """
+    logger = logging.getLogger(__name__)
+    # Conferences are tracked by URL, so one linked twice must only be scraped (and yielded) once
+    conference_urls = sorted(set(conference_urls), key=conference_sort_key)
+    discoveries = {executor.submit(scrape_talk_urls, url, executor.parser): url for url in conference_urls}
+
+    sessions_by_conference: dict[str, dict[str, list[str]]] = {}
+    talks_by_conference: dict[str, dict[Future, str]] = {}
+    pending: set[Future] = set(discoveries)
+    next_conference = 0
+
+    with tqdm(total=0, desc="Scraping talks", unit="talks") as progress:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in discoveries:
+                    conference_url = discoveries[future]
+                    sessions = future.result()
+                    sessions_by_conference[conference_url] = sessions
+                    if select_talks is not None:
+                        sessions = select_talks(conference_url, sessions)
+                    talks = {
+                        executor.submit_talk(session, url): url for session, url in flatten_talk_data({"": sessions})
+                    }
+                    talks_by_conference[conference_url] = talks
+                    pending.update(talks)
+                    progress.total += len(talks)
+                    progress.refresh()
+                else:
+                    progress.update()
+
+            # Flush every conference that is now complete and not waiting on an earlier one
+            while next_conference < len(conference_urls):
+                conference_url = conference_urls[next_conference]
+                talks = talks_by_conference.get(conference_url)
+                if talks is None or not all(talk.done() for talk in talks):
+                    break
+                results, failed_urls = [], []
+                for talk, url in talks.items():
+                    if talk.exception() is not None:
+                        logger.warning(f"Could not scrape {url}: {talk.exception()}")
+                        failed_urls.append(url)
+                    elif (result := talk.result()) is not None:
+                        results.append(result)
+                results.sort(key=Talk.sort_key)
+                logger.debug(f"Scraped {len(results)} talks from {conference_url}")
+                yield conference_url, sessions_by_conference.pop(conference_url), results, failed_urls
+                del talks_by_conference[conference_url]
+                next_conference += 1
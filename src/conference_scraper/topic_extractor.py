@@ -1,68 +1,51 @@
 """Topic extraction functionality using Groq API with rate limiting."""
 
 import logging
+import threading
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Mapping
 
-import groq
-
-logger = logging.getLogger(__name__)
-
-# Rate limiting: Usually 30 requests per minute = 2 seconds between requests
-RATE_LIMIT_SECONDS = 3  # Slightly over 2 to be safe
-
-
-def _rate_limit():
-    """Rate limiting function."""
-    time.sleep(RATE_LIMIT_SECONDS)
+from .config import DEFAULT_TOPIC_REQUESTS_PER_MINUTE, DEFAULT_TOPIC_TOKENS_PER_MINUTE, DEFAULT_TOPIC_WORKERS
+from .ratelimit import TokenBucket, backoff_delay, parse_duration, parse_retry_after
 
+# groq is slow to import and only needed once topic extraction is requested, which hands us a client
+if TYPE_CHECKING:
+    import groq
 
-def extract_topics_groq(text: str, client: groq.Groq) -> List[str]:
-    """Extract 3-10 main topics from text using Groq API with rate limiting.
-
-    Args:
-        text: The speech text to analyze
-        client: Groq API client instance
-
-    Returns:
-        List of topic strings (raises exception if extraction fails)
+logger = logging.getLogger(__name__)
 
-    Raises:
-        Exception: If topic extraction fails for any reason
-    """
-    if not text.strip():
-        return []
+MODEL = "llama-3.1-8b-instant"  # Fast and has higher limits
+# MODEL = "llama-3.3-70b-versatile"  # Best quality for topic extraction
+# MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct"  # Last fallback
+MAX_COMPLETION_TOKENS = 100  # Enough for 3-5 topics
+# Truncate texts to save tokens (most talks have key themes early)
+MAX_TEXT_CHARS = 4000
+# Rough characters per token of English text, for estimating what a request costs before sending it
+CHARS_PER_TOKEN = 4
 
-    # Enforce rate limiting
-    _rate_limit()
+DEFAULT_TOPIC_RETRIES = 5
 
-    # Highly optimized prompt for minimal tokens while maximizing clarity
-    # Truncate text to first 4000 chars to save tokens (most talks have key themes early)
-    truncated_text = text[:4000] if len(text) > 4000 else text
 
-    prompt = f"""
+def build_prompt(text: str) -> str:
+    """Highly optimized prompt for minimal tokens while maximizing clarity."""
+    return f"""
 Extract 3-5 main topics from this General Conference talk of the Church of Jesus Christ of Latter-day Saints.
 Return only comma-separated topics, no explanations or other text:
 
-{truncated_text}
+{text[:MAX_TEXT_CHARS]}
 """
 
-    # Don't catch exceptions - let them propagate to caller
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",  # Fast and has higher limits
-        # model="llama-3.3-70b-versatile",  # Best quality for topic extraction
-        # model="meta-llama/llama-4-maverick-17b-128e-instruct",  # Last fallback
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2,  # Low temperature for consistent results
-        max_tokens=100,  # Enough for 3-5 topics
-        top_p=0.9,
-    )
 
-    topics_str = response.choices[0].message.content.strip()
+def estimate_tokens(prompt: str) -> int:
+    """Estimate the tokens a request counts against the limits: the prompt plus the most the completion may use."""
+    return len(prompt) // CHARS_PER_TOKEN + MAX_COMPLETION_TOKENS
 
-    # Parse comma-separated topics and clean them
+
+def parse_topics(content: str | None) -> List[str]:
+    """Parse the model's comma-separated answer into cleaned up topics."""
     topics = []
-    for topic in topics_str.split(","):
+    for topic in (content or "").strip().split(","):
         topic = topic.strip()
         # Remove common prefixes/suffixes that might appear
         topic = topic.strip("\"'").lstrip("•-• ").rstrip(".")
@@ -75,3 +58,146 @@ Return only comma-separated topics, no explanations or other text:
 
     logger.debug(f"Extracted {topic_count} topics: {topics}")
     return topics
+
+
+class TopicRateLimiter:
+    """Client-side view of the API's request and token limits, shared by every extraction worker.
+
+    Each request waits for one request and its estimated tokens from two token buckets refilled at the configured per
+    minute rates. After every response both buckets are lowered to whatever the API reports as remaining, and once
+    either runs out all workers pause until the API says it resets.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_TOPIC_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOPIC_TOKENS_PER_MINUTE,
+    ):
+        self.requests = TokenBucket(requests_per_minute / 60, capacity=requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60, capacity=tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float) -> None:
+        """Block until a request costing `tokens` may be sent."""
+        while True:
+            with self._lock:
+                pause = self._paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            time.sleep(pause)
+        self.requests.acquire()
+        self.tokens.acquire(tokens)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Adapt to the x-ratelimit-remaining-* and x-ratelimit-reset-* headers of a response."""
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            try:
+                remaining = float(headers[f"x-ratelimit-remaining-{kind}"])
+            except (KeyError, ValueError):
+                continue
+            bucket.drain(remaining)
+            if remaining < 1:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    logger.info(f"Out of {kind} for topic extraction, pausing for {reset:.1f}s")
+                    self.pause(reset)
+
+    def throttled(self, headers: Mapping[str, str], retry_after: float) -> None:
+        """Record a 429 from the API: empty both buckets and pause for `retry_after` seconds."""
+        self.requests.drain()
+        self.tokens.drain()
+        self.update(headers)
+        self.pause(retry_after)
+        logger.warning(f"Throttled by the topic extraction API, pausing for {retry_after:.1f}s")
+
+
+class TopicExtractor:
+    """Extracts topics for many talks at once with concurrent requests governed by a shared TopicRateLimiter.
+
+    Requests that are throttled (429) or fail with connection errors, timeouts or 5xx responses are retried up to
+    `max_retries` times. Use as a context manager, or call close() when done.
+    """
+
+    def __init__(
+        self,
+        client: "groq.Groq",
+        workers: int = DEFAULT_TOPIC_WORKERS,
+        requests_per_minute: float = DEFAULT_TOPIC_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOPIC_TOKENS_PER_MINUTE,
+        max_retries: int = DEFAULT_TOPIC_RETRIES,
+    ):
+        self.client = client
+        self.max_retries = max_retries
+        self.limiter = TopicRateLimiter(requests_per_minute, tokens_per_minute)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="topics")
+
+    def extract(self, text: str) -> List[str]:
+        """Extract 3-5 main topics from a talk's text.
+
+        Raises:
+            groq.APIError: If the request still fails after all retries, or fails in a way that isn't worth retrying
+        """
+        import groq
+
+        if not text.strip():
+            return []
+
+        prompt = build_prompt(text)
+        cost = estimate_tokens(prompt)
+        attempt = 0
+        while True:
+            self.limiter.acquire(cost)
+            try:
+                response = self.client.chat.completions.with_raw_response.create(
+                    model=MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.2,  # Low temperature for consistent results
+                    max_tokens=MAX_COMPLETION_TOKENS,
+                    top_p=0.9,
+                )
+            except groq.RateLimitError as e:
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                if retry_after is None:
+                    retry_after = backoff_delay(attempt)
+                self.limiter.throttled(e.response.headers, retry_after)
+            except (groq.APIConnectionError, groq.InternalServerError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.debug(f"Retrying topic extraction in {delay:.1f}s after {e}")
+                time.sleep(delay)
+            else:
+                self.limiter.update(response.headers)
+                return parse_topics(response.parse().choices[0].message.content)
+            attempt += 1
+
+    def extract_many(self, texts: List[str]) -> List[List[str] | Exception]:
+        """Extract topics for several texts concurrently.
+
+        Returns:
+            Each text's topics, or the exception its extraction failed with, in the order the texts were given
+        """
+        futures = [self._executor.submit(self.extract, text) for text in texts]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "TopicExtractor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,65 @@
+"""The on-disk response cache: what it keeps, and what prune() removes."""
+
+import json
+
+from requests.structures import CaseInsensitiveDict
+
+from conference_scraper.cache import ResponseCache
+
+HEADERS = CaseInsensitiveDict(
+    {
+        "ETag": '"v1"',
+        "Last-Modified": "Sat, 04 Apr 2020 10:00:00 GMT",
+        "Set-Cookie": "session=secret; Secure; HttpOnly",
+        "Date": "Sun, 18 Oct 2026 13:00:00 GMT",
+        "Content-Type": "text/html",
+    }
+)
+VALIDATORS = {"etag": '"v1"', "last-modified": "Sat, 04 Apr 2020 10:00:00 GMT"}
+
+
+def index_entries(cache: ResponseCache) -> list[dict]:
+    return [json.loads(path.read_text()) for path in cache.index_dir.glob("*.json")]
+
+
+def test_store_keeps_only_validators(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store("https://example.org/a", b"page a", HEADERS)
+
+    assert [entry["headers"] for entry in index_entries(cache)] == [VALIDATORS]
+    entry = cache.lookup("https://example.org/a")
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Sat, 04 Apr 2020 10:00:00 GMT",
+    }
+    assert cache.read(entry) == b"page a"
+
+
+def test_store_skips_responses_without_validators(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store("https://example.org/a", b"page a", {"Set-Cookie": "session=secret"})
+
+    assert cache.lookup("https://example.org/a") is None
+    assert index_entries(cache) == []
+
+
+def test_prune(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.store("https://example.org/a", b"old page a", HEADERS)
+    cache.store("https://example.org/b", b"shared page", HEADERS)
+    cache.store("https://example.org/c", b"shared page", HEADERS)
+    cache.store("https://example.org/a", b"new page a", HEADERS)
+    (cache.index_dir / ".tmp-interrupted").write_bytes(b"")
+    # An entry from before only the validators were kept
+    legacy_path = cache._index_path("https://example.org/b")
+    legacy = json.loads(legacy_path.read_text())
+    legacy["headers"] = {"set-cookie": "session=secret", **VALIDATORS}
+    legacy_path.write_text(json.dumps(legacy))
+
+    # The superseded body of page a and the temporary file
+    assert cache.prune() == 2
+    assert cache.prune() == 0
+    assert len(list(cache.objects_dir.glob("*/*"))) == 2
+    assert [entry["headers"] for entry in index_entries(cache)] == [VALIDATORS] * 3
+    for url, content in [("a", b"new page a"), ("b", b"shared page"), ("c", b"shared page")]:
+        assert cache.read(cache.lookup(f"https://example.org/{url}")) == content
@@ -0,0 +1,42 @@
+"""End-to-end behavior of the scrape command, with the site stubbed out."""
+
+import pytest
+
+from conference_scraper import scraper
+from conference_scraper.cli import main_scrape_process
+from conference_scraper.scraper import TalkScrapeError
+
+CONFERENCE_URL = "https://www.churchofjesuschrist.org/study/general-conference/2020/04?lang=eng"
+TALK_URL = "https://www.churchofjesuschrist.org/study/general-conference/2020/04/11talk?lang=eng"
+
+
+@pytest.fixture
+def previous_export(tmp_path):
+    json_file = tmp_path / "conference_talks.json"
+    json_file.write_text('[{"title": "A talk from the last run"}]')
+    return json_file
+
+
+def test_no_conferences_found_keeps_previous_export(monkeypatch, tmp_path, previous_export):
+    monkeypatch.setattr(scraper, "scrape_conference_pages", lambda url, executor: [])
+
+    with pytest.raises(RuntimeError, match="Found no conferences"):
+        main_scrape_process(tmp_path, http_cache=False)
+    assert previous_export.read_text() == '[{"title": "A talk from the last run"}]'
+    assert not (tmp_path / "conference_talks_no_text.db").exists()
+
+
+def test_no_talks_scraped_keeps_previous_export(monkeypatch, tmp_path, previous_export):
+    def scrape_talk_data(session_url, parser):
+        raise TalkScrapeError("Could not fetch the page")
+
+    monkeypatch.setattr(scraper, "scrape_conference_pages", lambda url, executor: [CONFERENCE_URL])
+    monkeypatch.setattr(scraper, "scrape_talk_urls", lambda url, parser: {"Saturday Morning": [TALK_URL]})
+    monkeypatch.setattr(scraper, "scrape_talk_data", scrape_talk_data)
+
+    with pytest.raises(RuntimeError, match="No talks could be scraped"):
+        main_scrape_process(tmp_path, http_cache=False)
+    assert previous_export.read_text() == '[{"title": "A talk from the last run"}]'
+    assert [path.name for path in tmp_path.iterdir() if "conference_talks.json" in path.name] == [
+        "conference_talks.json"
+    ]
@@ -0,0 +1,153 @@
+"""Loading talks into the database and building the published copies of it."""
+
+import sqlite3
+
+import pytest
+
+from conference_scraper.database import VIEW_INDEXES, build_no_text_db, bulk_build, insert_talks, setup_sql
+from conference_scraper.models import Talk
+
+BASE = "https://www.churchofjesuschrist.org/study/general-conference"
+
+
+def make_talk(year: int, number: int, speaker: str, calling: str | None = None, season: str = "April") -> Talk:
+    month = "04" if season == "April" else "10"
+    return Talk(
+        title=f"Talk {number}",
+        speaker=speaker,
+        calling=calling,
+        year=str(year),
+        season=season,
+        url=f"{BASE}/{year}/{month}/{number}talk?lang=eng",
+        talk=f"The text of talk {number}",
+        session="Saturday Morning",
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    con, cur, db_path = setup_sql(tmp_path)
+    yield con, cur, db_path
+    con.close()
+
+
+def callings_by_talk(cur) -> dict[tuple[str, int], str | None]:
+    """Each stored talk's calling, keyed by (title, year)."""
+    return {
+        (title, year): calling
+        for title, year, calling in cur.execute("""
+            SELECT t.title, c.year, cl.name FROM talks t
+            JOIN conferences c ON c.id = t.conference
+            LEFT JOIN talk_callings tcl ON tcl.talk = t.id
+            LEFT JOIN callings cl ON cl.id = tcl.calling
+        """)
+    }
+
+
+def test_insert_talks(db, tmp_path):
+    con, cur, _ = db
+    oaks = "By Elder Dallin H. Oaks"
+    conferences = [
+        [make_talk(2018, 1, oaks, "Of the Seventy"), make_talk(2018, 2, "By Sister Jean B. Bingham", None)],
+        [make_talk(2019, 1, oaks, "Of the Quorum of the Twelve Apostles"), make_talk(2019, 2, oaks, None)],
+    ]
+    # Loaded the way the scraper does: conference by conference, in chronological order, one transaction each
+    for talks in conferences:
+        assert insert_talks(cur, talks) == (2, [])
+        con.commit()
+
+    callings = callings_by_talk(cur)
+    # A talk without a calling takes its speaker's most recent one, even from earlier in the same batch
+    assert callings[("Talk 2", 2019)] == "Quorum Of The Twelve Apostles"
+    # A speaker without any calling yet stays without one
+    assert callings[("Talk 2", 2018)] is None
+
+    # Loading a talk again (same title and conference) stores nothing new
+    assert insert_talks(cur, [make_talk(2019, 1, oaks, "Of the Quorum of the Twelve Apostles")]) == (0, [])
+    con.commit()
+    assert cur.execute("SELECT COUNT(*) FROM talks").fetchone() == (4,)
+    assert cur.execute("SELECT COUNT(*) FROM talk_urls").fetchone() == (4,)
+
+    # Later runs inherit callings stored by earlier ones, and talks without a text get no text row
+    con.close()
+    con, cur, _ = setup_sql(tmp_path)
+    without_text = make_talk(2020, 1, oaks, None)
+    without_text.talk = None
+    assert insert_talks(cur, [without_text]) == (1, [])
+    con.commit()
+    assert callings_by_talk(cur)[("Talk 1", 2020)] == "Quorum Of The Twelve Apostles"
+    assert cur.execute("""
+        SELECT COUNT(*) FROM talk_texts tt JOIN talks t ON t.id = tt.talk
+        JOIN conferences c ON c.id = t.conference WHERE c.year = 2020
+    """).fetchone() == (0,)
+    assert cur.execute("SELECT COUNT(*) FROM talk_speakers").fetchone() == (5,)
+    con.close()
+
+
+def test_interrupted_bulk_build_rolls_back(db):
+    con, cur, _ = db
+    with pytest.raises(KeyboardInterrupt):
+        with bulk_build(con):
+            insert_talks(cur, [make_talk(2020, 1, "By Elder Dallin H. Oaks", "Of the Quorum of the Twelve Apostles")])
+            con.commit()
+            insert_talks(cur, [make_talk(2020, 2, "By Sister Jean B. Bingham", "Relief Society General President")])
+            raise KeyboardInterrupt
+
+    # Only the committed conference is stored, and the database is back to its usual indexes and journal
+    assert cur.execute("SELECT title FROM talks").fetchall() == [("Talk 1",)]
+    assert cur.execute("SELECT name FROM speakers").fetchall() == [("Dallin H. Oaks",)]
+    indexes = {name for (name,) in cur.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(VIEW_INDEXES) <= indexes
+    assert cur.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+
+    # The IDs cached for the rolled back speaker, calling and organization must not be reused
+    with bulk_build(con):
+        insert_talks(cur, [make_talk(2020, 2, "By Sister Jean B. Bingham", "Relief Society General President")])
+    assert cur.execute("SELECT speaker, calling, organization FROM talk_details WHERE title = 'Talk 2'").fetchone() == (
+        "Jean B. Bingham",
+        "Relief Society General President",
+        "Relief Society General Presidency",
+    )
+
+
+def test_no_text_db(db, tmp_path):
+    con, cur, db_path = db
+    with bulk_build(con):
+        insert_talks(
+            cur,
+            [
+                make_talk(2020, 1, "By Elder Dallin H. Oaks", "Of the Quorum of the Twelve Apostles"),
+                make_talk(2020, 2, "By Sister Jean B. Bingham", "Relief Society General President"),
+                make_talk(2020, 3, "By President Russell M. Nelson", "President of the Church"),
+            ],
+        )
+    # Leave the talks counter ahead of the highest ID, which only sqlite_sequence remembers
+    for table in ("talk_speakers", "talk_callings", "talk_texts", "talk_urls", "talk_sessions"):
+        cur.execute(f"DELETE FROM {table} WHERE talk = 3")
+    cur.execute("DELETE FROM talks WHERE id = 3")
+    con.commit()
+
+    no_text_path = tmp_path / "no_text.db"
+    build_no_text_db(db_path, no_text_path)
+    no_text = sqlite3.connect(no_text_path)
+    try:
+        source_schema = set(cur.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+        schema = set(no_text.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+        assert {name for _, name in source_schema - schema} >= {"talk_texts", "talk_texts_fts", "text_dictionaries"}
+        assert all(name.startswith(("talk_texts", "text_")) for _, name in source_schema - schema)
+        assert schema < source_schema
+        assert {name for type, name in schema if type == "index"} >= set(VIEW_INDEXES)
+
+        sequences = no_text.execute("SELECT name, seq FROM sqlite_sequence ORDER BY name").fetchall()
+        source_sequences = cur.execute(
+            "SELECT name, seq FROM sqlite_sequence WHERE name NOT LIKE 'talk_texts%' ORDER BY name"
+        ).fetchall()
+        assert sequences == source_sequences
+        assert ("talks", 3) in sequences
+        assert no_text.execute("SELECT title FROM talk_details ORDER BY id").fetchall() == [("Talk 1",), ("Talk 2",)]
+
+        # New rows continue from the full database's counters instead of reusing deleted IDs
+        no_text.execute("INSERT INTO talks (title, emeritus, conference) VALUES ('Talk 4', 0, 1)")
+        assert no_text.execute("SELECT MAX(id) FROM talks").fetchone() == (4,)
+    finally:
+        no_text.close()
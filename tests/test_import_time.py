@@ -0,0 +1,40 @@
+"""Importing the CLI must stay cheap: `--help` and search shouldn't pay for the scraping or topic extraction stacks."""
+
+import json
+import re
+import subprocess
+import sys
+
+# Imported only by the commands that need them
+HEAVY_MODULES = ["requests", "bs4", "groq", "zstandard"]
+# Cumulative import time of conference_scraper.cli, best of a few runs. It measures around 55-65 ms; importing any one
+# of the heavy modules eagerly adds at least 100 ms more.
+IMPORT_BUDGET_MS = 150
+RUNS = 3
+
+
+def import_cli() -> tuple[float, list[str]]:
+    """Import the CLI in a fresh interpreter and return its cumulative import time (ms) and the heavy modules loaded."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import json, sys; import conference_scraper.cli; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| conference_scraper\.cli$", result.stderr, re.MULTILINE)
+    assert match, result.stderr
+    return int(match.group(1)) / 1000, json.loads(result.stdout)
+
+
+def test_cli_import_is_light():
+    runs = [import_cli() for _ in range(RUNS)]
+    assert all(loaded == [] for _, loaded in runs), runs
+    fastest = min(elapsed for elapsed, _ in runs)
+    assert fastest < IMPORT_BUDGET_MS, f"importing conference_scraper.cli took {fastest:.1f} ms"
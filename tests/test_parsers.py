@@ -0,0 +1,46 @@
+"""Every HTML parser backend must scrape a talk page into the same Talk."""
+
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+from conference_scraper.config import Parser, ensure_parser_available
+from conference_scraper.scraper import parse_talk_data
+
+FIXTURES = Path(__file__).parent / "fixtures"
+URL = "https://www.churchofjesuschrist.org/study/general-conference/2023/04/14teixeira?lang=eng"
+SESSION = "Saturday Morning"
+
+
+@pytest.fixture(scope="module")
+def talk_page() -> bytes:
+    return (FIXTURES / "talk.html").read_bytes()
+
+
+@pytest.fixture(scope="module")
+def reference_talk(talk_page):
+    return parse_talk_data(SESSION, URL, talk_page, Parser.html5lib)
+
+
+def test_reference_talk(reference_talk):
+    assert reference_talk.title == "The Plan of Happiness"
+    # Scraped text is NFD-normalized
+    assert reference_talk.speaker == unicodedata.normalize("NFD", "By Elder José A. Teixeira")
+    assert reference_talk.calling == "Of the Seventy"
+    assert (reference_talk.year, reference_talk.season, reference_talk.session) == ("2023", "April", SESSION)
+    paragraphs = reference_talk.talk.split("\n\n")
+    assert paragraphs[0].startswith("My dear brothers and sisters")
+    assert paragraphs[1].startswith(unicodedata.normalize("NFD", "In a small café in São Paulo"))
+    assert paragraphs[-1] == "In the name of Jesus Christ, amen."
+    assert "not part of the talk" not in reference_talk.talk
+
+
+@pytest.mark.parametrize("parser", list(Parser), ids=lambda parser: parser.value)
+def test_backends_agree(parser, talk_page, reference_talk):
+    try:
+        ensure_parser_available(parser)
+    except ImportError:
+        pytest.skip(f"{parser.value} isn't installed")
+
+    assert parse_talk_data(SESSION, URL, talk_page, parser) == reference_talk
@@ -0,0 +1,101 @@
+"""The view indexes must keep the speaker and calling lookups and the talk_details joins off full table scans."""
+
+import pytest
+
+from conference_scraper.database import bulk_build, insert_talks, setup_sql
+from conference_scraper.models import Talk
+
+SPEAKERS = [
+    ("By Elder Dallin H. Oaks", "Of the Quorum of the Twelve Apostles"),
+    ("By President Russell M. Nelson", "President of The Church of Jesus Christ of Latter-day Saints"),
+    ("By Sister Jean B. Bingham", "Relief Society General President"),
+    ("By Bishop Gérald Caussé", "Presiding Bishop"),
+]
+
+
+@pytest.fixture(scope="module")
+def cur(tmp_path_factory):
+    # Loaded the way the scraper loads a new database, so the indexes are the ones bulk_build recreates
+    con, cur, _ = setup_sql(tmp_path_factory.mktemp("db"))
+    talks = [
+        Talk(
+            title=f"Talk {year} {number}",
+            speaker=speaker,
+            calling=calling,
+            year=str(year),
+            season="April",
+            url=f"https://www.churchofjesuschrist.org/study/general-conference/{year}/04/{number}talk?lang=eng",
+            talk=f"Talk {number} about faith",
+            session="Saturday Morning",
+        )
+        for year in (2021, 2022)
+        for number, (speaker, calling) in enumerate(SPEAKERS)
+    ]
+    with bulk_build(con):
+        insert_talks(cur, talks)
+    yield cur
+    con.close()
+
+
+def query_plan(cur, sql: str) -> list[str]:
+    return [row[3] for row in cur.execute(f"EXPLAIN QUERY PLAN {sql}", (1,))]
+
+
+@pytest.mark.parametrize(
+    ("sql", "index"),
+    [
+        pytest.param(
+            "SELECT talk FROM talk_speakers WHERE speaker = ?", "idx_talk_speakers_speaker", id="talk-ids-by-speaker"
+        ),
+        pytest.param(
+            "SELECT talk FROM talk_callings WHERE calling = ?", "idx_talk_callings_calling", id="talk-ids-by-calling"
+        ),
+        pytest.param(
+            "SELECT id FROM callings WHERE organization = ?", "idx_callings_organization", id="callings-by-organization"
+        ),
+        pytest.param(
+            "SELECT t.id, t.title FROM talks t JOIN talk_speakers ts ON ts.talk = t.id WHERE ts.speaker = ?",
+            "idx_talk_speakers_speaker",
+            id="talks-by-speaker",
+        ),
+        pytest.param(
+            "SELECT t.id, t.title FROM talks t JOIN talk_callings tc ON tc.talk = t.id WHERE tc.calling = ?",
+            "idx_talk_callings_calling",
+            id="talks-by-calling",
+        ),
+        pytest.param(
+            "SELECT * FROM speaker_highest_calling WHERE speaker_id = ?",
+            "idx_talk_speakers_speaker",
+            id="speaker-highest-calling",
+        ),
+    ],
+)
+def test_lookup_uses_index(cur, sql, index):
+    plan = query_plan(cur, sql)
+    assert any(f"USING COVERING INDEX {index} " in step or f"USING INDEX {index} " in step for step in plan), plan
+    # A view's single matching group is read back from its co-routine, which isn't a table scan
+    assert not [step for step in plan if step.startswith("SCAN ") and step != "SCAN speaker_highest_calling"], plan
+
+
+# Every table talk_details joins, by its alias in the view
+TALK_DETAILS_TABLES = ["t", "c", "ts", "s", "tsesh", "sesh", "u", "tcl", "cl", "o"]
+
+
+def table_steps(plan: list[str]) -> dict[str, str]:
+    """The plan's step for each table alias of talk_details."""
+    return {step.split()[1]: step for step in plan if step.split()[1] in TALK_DETAILS_TABLES}
+
+
+def test_talk_details_by_id_searches_every_join(cur):
+    steps = table_steps(query_plan(cur, "SELECT * FROM talk_details WHERE id = ?"))
+    assert sorted(steps) == sorted(TALK_DETAILS_TABLES)
+    assert all(step.startswith("SEARCH ") for step in steps.values()), steps
+
+
+@pytest.mark.parametrize("column", ["year", "speaker"])
+def test_talk_details_by_other_columns_scans_talks(cur, column):
+    # Known limitation (see migrate_to_v3): the view is grouped by talk, so only an id filter reaches the joins. Every
+    # talk is still joined through the indexes rather than by scanning the other tables.
+    steps = table_steps(query_plan(cur, f"SELECT * FROM talk_details WHERE {column} = ?"))
+    assert steps.pop("t") == "SCAN t"
+    assert all(step.startswith("SEARCH ") for step in steps.values()), steps
@@ -0,0 +1,53 @@
+"""Streaming conferences through the scrape executor, with the site stubbed out."""
+
+import pytest
+
+from conference_scraper import scraper
+from conference_scraper.models import Talk
+from conference_scraper.scraper import ScrapeExecutor, TalkScrapeError, stream_talk_data
+
+BASE = "https://www.churchofjesuschrist.org/study/general-conference"
+
+
+def conference_url(year: int) -> str:
+    return f"{BASE}/{year}/04?lang=eng"
+
+
+def talk_url(year: int, number: int) -> str:
+    return f"{BASE}/{year}/04/{number}talk?lang=eng"
+
+
+@pytest.fixture
+def stub_site(monkeypatch):
+    """Every conference has two talks in one session. Talk 2 of 2000 fails to scrape."""
+
+    def scrape_talk_urls(url, parser):
+        year = int(url.split("/")[-2])
+        return {"Saturday Morning": [talk_url(year, 1), talk_url(year, 2)]}
+
+    def scrape_talk_data(session_url, parser):
+        session, url = session_url
+        if url == talk_url(2000, 2):
+            raise TalkScrapeError("Could not fetch the page")
+        year = url.split("/")[-3]
+        return Talk("Title", "By Elder Test", None, year, "April", url, "Text", session)
+
+    monkeypatch.setattr(scraper, "scrape_talk_urls", scrape_talk_urls)
+    monkeypatch.setattr(scraper, "scrape_talk_data", scrape_talk_data)
+
+
+def test_stream_yields_each_conference_once_in_order(stub_site):
+    urls = [conference_url(year) for year in (2010, 1990, 1990, 2000, 2010)]
+    with ScrapeExecutor(workers=4) as executor:
+        conferences = list(stream_talk_data(urls, executor))
+
+    assert [url for url, *_ in conferences] == [conference_url(year) for year in (1990, 2000, 2010)]
+    for url, sessions, talks, failed_urls in conferences:
+        year = int(url.split("/")[-2])
+        assert sessions == {"Saturday Morning": [talk_url(year, 1), talk_url(year, 2)]}
+        if year == 2000:
+            assert [talk.url for talk in talks] == [talk_url(year, 1)]
+            assert failed_urls == [talk_url(year, 2)]
+        else:
+            assert [talk.url for talk in talks] == [talk_url(year, 1), talk_url(year, 2)]
+            assert failed_urls == []